@@ -1,11 +1,22 @@
 # === FILE: control_panel.py ===
 
+import logging
+
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit,
                                QComboBox, QRadioButton, QPushButton, QButtonGroup,
-                               QListWidget, QSizePolicy, QSpacerItem, QHBoxLayout,
-                               QMessageBox, QListWidgetItem, QAbstractItemView)
-from PySide6.QtCore import Signal, Slot, Qt
-from PySide6.QtGui import QColor, QPalette
+                               QListView, QSizePolicy, QSpacerItem, QHBoxLayout,
+                               QMessageBox, QAbstractItemView, QAbstractButton)
+from PySide6.QtCore import Signal, Slot, Qt, QTimer, QStringListModel, QModelIndex
+
+log = logging.getLogger(__name__)
+
+_BTN_PRIMARY_SS = 'background-color: #2196F3; color: white; padding: 5px; border-radius: 3px;'
+_BTN_SUCCESS_SS = 'background-color: #4CAF50; color: white; padding: 5px; border-radius: 3px;'
+_BTN_WARNING_SS = 'background-color: #ff9800; color: white; padding: 5px; border-radius: 3px;'
+_BTN_GRAY_SS = 'background-color: #9E9E9E; color: white; padding: 5px; border-radius: 3px;'
+_BTN_PLAIN_SS = 'padding: 5px; border-radius: 3px;'
+_STATUS_RUNNING_SS = "background-color: darkgreen; color: white; padding: 3px; border-radius: 5px;"
+_STATUS_IDLE_SS = "background-color: lightgray; color: black; padding: 3px; border-radius: 5px;"
 
 class ControlPanel(QWidget):
     # Signals
@@ -18,6 +29,8 @@ class ControlPanel(QWidget):
     free_spot_highlight_requested = Signal(int)
     street_changed_signal = Signal(str)
 
+    FREE_SPOTS_REFRESH_MS = 120
+
     def __init__(self):
         super().__init__()
         self.setFixedWidth(300)
@@ -36,8 +49,8 @@ class ControlPanel(QWidget):
         # Street Selection
         self.layout.addWidget(QLabel('Select Street'))
         self.street_select = QComboBox()
-        self.street_select.addItem("Main Street")
-        self.street_select.addItem("Visual Street")
+        self._current_streets = ("Main Street", "Visual Street")
+        self.street_select.addItems(self._current_streets)
         self.street_select.currentIndexChanged.connect(self._on_street_changed)
         self.layout.addWidget(self.street_select)
 
@@ -51,7 +64,9 @@ class ControlPanel(QWidget):
         self.search_mode_group.addButton(self.yolo_radio)
         self.search_mode_group.addButton(self.math_radio)
         self.search_mode_group.addButton(self.video_radio)
-        self.search_mode_group.buttonClicked.connect(self._update_find_parking_button_state)
+        self._mode_by_button = {self.yolo_radio: 'YOLOV', self.math_radio: 'MATH', self.video_radio: 'VIDEO'}
+        self._selected_mode = 'YOLOV'
+        self.search_mode_group.buttonClicked.connect(self._on_search_mode_clicked)
         h_layout_modes = QHBoxLayout()
         h_layout_modes.addWidget(self.yolo_radio)
         h_layout_modes.addWidget(self.video_radio)
@@ -60,9 +75,6 @@ class ControlPanel(QWidget):
         # Search Status Indicator
         self.search_status_indicator = QLabel("Status: Idle")
         self.search_status_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.search_status_indicator.setAutoFillBackground(True)
-        self.search_status_indicator.setStyleSheet("padding: 3px; border-radius: 5px;")
-        self.update_search_status(False)
         self.layout.addWidget(self.search_status_indicator)
 
         # Assigned Spot Information
@@ -73,42 +85,47 @@ class ControlPanel(QWidget):
 
         # Available Spots List
         self.layout.addWidget(QLabel("Available Spots:"))
-        self.free_spots_display = QListWidget()
+        self._free_spots_model = QStringListModel(self)
+        self.free_spots_display = QListView()
+        self.free_spots_display.setModel(self._free_spots_model)
         self.free_spots_display.setFixedHeight(100)
         self.free_spots_display.setToolTip("Click on a free spot to highlight it on the map.")
         self.free_spots_display.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.free_spots_display.itemClicked.connect(self.on_free_spot_selected)
+        self.free_spots_display.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.free_spots_display.setUniformItemSizes(True)
+        self.free_spots_display.setLayoutMode(QListView.LayoutMode.SinglePass)
+        self.free_spots_display.clicked.connect(self.on_free_spot_selected)
         self.layout.addWidget(self.free_spots_display)
 
         self.layout.addSpacerItem(QSpacerItem(20, 20, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding))
 
         # Control Buttons
         self.find_parking_btn = QPushButton('Find Parking')
-        self.find_parking_btn.setStyleSheet('background-color: #2196F3; color: white; padding: 5px; border-radius: 3px;')
+        self.find_parking_btn.setStyleSheet(_BTN_PRIMARY_SS)
         self.find_parking_btn.clicked.connect(self.on_find_parking_clicked)
 
         self.assign_spot_btn = QPushButton('Assign Free Spot')
-        self.assign_spot_btn.setStyleSheet('background-color: #4CAF50; color: white; padding: 5px; border-radius: 3px;')
+        self.assign_spot_btn.setStyleSheet(_BTN_SUCCESS_SS)
         self.assign_spot_btn.clicked.connect(self.on_assign_spot_clicked)
         self.assign_spot_btn.setEnabled(False)
         self.assign_spot_btn.setToolTip("Start search first. Enter name and car.")
 
         self.cancel_assignment_btn = QPushButton('Cancel Assignment')
-        self.cancel_assignment_btn.setStyleSheet('background-color: #ff9800; color: white; padding: 5px; border-radius: 3px;')
+        self.cancel_assignment_btn.setStyleSheet(_BTN_WARNING_SS)
         self.cancel_assignment_btn.clicked.connect(self.on_cancel_assignment_clicked)
         self.cancel_assignment_btn.setVisible(False)
         self.cancel_assignment_btn.setEnabled(False)
 
         self.edit_rois_btn = QPushButton('Edit Parking Zones')
-        self.edit_rois_btn.setStyleSheet('padding: 5px; border-radius: 3px;')
+        self.edit_rois_btn.setStyleSheet(_BTN_PLAIN_SS)
         self.edit_rois_btn.clicked.connect(self.on_edit_rois_clicked)
 
         self.theme_toggle_btn = QPushButton('Toggle Theme')
-        self.theme_toggle_btn.setStyleSheet('padding: 5px; border-radius: 3px;')
+        self.theme_toggle_btn.setStyleSheet(_BTN_PLAIN_SS)
         self.theme_toggle_btn.clicked.connect(self.on_toggle_theme_clicked)
 
         self.close_btn = QPushButton('Close')
-        self.close_btn.setStyleSheet('background-color: #9E9E9E; color: white; padding: 5px; border-radius: 3px;')
+        self.close_btn.setStyleSheet(_BTN_GRAY_SS)
         self.close_btn.clicked.connect(self.on_close_clicked)
 
         self.layout.addWidget(self.find_parking_btn)
@@ -120,22 +137,36 @@ class ControlPanel(QWidget):
         self.setLayout(self.layout)
 
         self._has_free_spots = False
-        self._update_find_parking_button_state()
+        self._last_free_set = ()
+        self._selected_spot_index = None
+        self._pending_free_spots = {}
+        self._free_spots_refresh_timer = QTimer(self)
+        self._free_spots_refresh_timer.setSingleShot(True)
+        self._free_spots_refresh_timer.timeout.connect(self._apply_pending_free_spots)
+        self._last_assign_state = None
+        self._input_warning_box = QMessageBox(QMessageBox.Icon.Warning, "Input Missing", "",
+                                              QMessageBox.StandardButton.Ok, self)
+        self._is_searching = None
+        self.update_search_status(False)
 
     def populate_street_selector(self, street_names):
-        self.street_select.blockSignals(True)
-        current_selection = self.street_select.currentText()
-        self.street_select.clear()
-        self.street_select.addItems(street_names)
-        
-        index = self.street_select.findText(current_selection)
-        if index != -1:
-            self.street_select.setCurrentIndex(index)
-        elif street_names:
-            self.street_select.setCurrentIndex(0)
-            
-        self.street_select.blockSignals(False)
-        self._on_street_changed(self.street_select.currentIndex())
+        previous_selection = self.street_select.currentText()
+        if tuple(street_names) != self._current_streets:
+            self.street_select.blockSignals(True)
+            self.street_select.clear()
+            self.street_select.addItems(street_names)
+
+            index = self.street_select.findText(previous_selection)
+            if index != -1:
+                self.street_select.setCurrentIndex(index)
+            elif street_names:
+                self.street_select.setCurrentIndex(0)
+
+            self.street_select.blockSignals(False)
+            self._current_streets = tuple(street_names)
+
+        if self.street_select.currentText() != previous_selection:
+            self._on_street_changed(self.street_select.currentIndex())
 
     @Slot(int)
     def _on_street_changed(self, index):
@@ -143,20 +174,20 @@ class ControlPanel(QWidget):
         self._update_find_parking_button_state()
         self.street_changed_signal.emit(selected_street)
 
+    @Slot(QAbstractButton)
+    def _on_search_mode_clicked(self, button):
+        self._selected_mode = self._mode_by_button.get(button, 'YOLOV')
+
     def get_selected_mode(self) -> str:
-        if self.yolo_radio.isChecked(): return 'YOLOV'
-        if self.math_radio.isChecked(): return 'MATH'
-        if self.video_radio.isChecked(): return 'VIDEO'
-        return 'YOLOV'
+        return self._selected_mode
 
     def get_selected_street(self) -> str:
         return self.street_select.currentText()
 
     @Slot()
     def _update_find_parking_button_state(self):
-        is_running = "Stop" in self.find_parking_btn.text()
         self.find_parking_btn.setEnabled(True)
-        if is_running:
+        if self._is_searching:
             self.find_parking_btn.setToolTip("Click to stop the current parking search.")
         else:
             self.find_parking_btn.setToolTip("Click to start searching for parking spots.")
@@ -164,42 +195,36 @@ class ControlPanel(QWidget):
 
     @Slot(dict)
     def update_free_spots(self, spot_states):
-        current_selection_index = -1
-        selected_items = self.free_spots_display.selectedItems()
-        if selected_items:
-             try:
-                 current_selection_index = int(selected_items[0].text().split(" ")[1])
-             except (ValueError, IndexError): pass
-
-        self.free_spots_display.clear()
-        free_spots_indices = []
-        has_free = False
-        item_to_select = None
-
-        for spot_index, status in sorted(spot_states.items()):
-            if status == 'free':
-                item_text = f"Spot {spot_index} (Free)"
-                list_item = QListWidgetItem(item_text)
-                list_item.setToolTip(f"Click to highlight spot {spot_index} on the map")
-                self.free_spots_display.addItem(list_item)
-                free_spots_indices.append(spot_index)
-                has_free = True
-                if spot_index == current_selection_index:
-                    item_to_select = list_item
-
-        if not has_free:
-             no_spots_item = QListWidgetItem("No free spots")
-             no_spots_item.setFlags(no_spots_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-             self.free_spots_display.addItem(no_spots_item)
-             if current_selection_index != -1:
-                 self.free_spot_highlight_requested.emit(-1)
+        self._pending_free_spots = spot_states
+        self._has_free_spots = 'free' in spot_states.values()
+        if not self._free_spots_refresh_timer.isActive():
+            self._free_spots_refresh_timer.start(self.FREE_SPOTS_REFRESH_MS)
+
+    @Slot()
+    def _apply_pending_free_spots(self):
+        spot_states = self._pending_free_spots
+        free_spots_indices = tuple(sorted(spot_index for spot_index, status in spot_states.items()
+                                          if status == 'free'))
+        if free_spots_indices == self._last_free_set and self._free_spots_model.rowCount():
+            return
+
+        has_free = bool(free_spots_indices)
+        if has_free:
+            self._free_spots_model.setStringList([f"Spot {spot_index} (Free)" for spot_index in free_spots_indices])
+        else:
+            self._free_spots_model.setStringList(["No free spots"])
 
         self._has_free_spots = has_free
+        self._last_free_set = free_spots_indices
 
-        if item_to_select:
-            self.free_spots_display.setCurrentItem(item_to_select)
-        elif current_selection_index != -1 and current_selection_index not in free_spots_indices:
-             self.free_spot_highlight_requested.emit(-1)
+        if self._selected_spot_index is None:
+            return
+        if self._selected_spot_index in free_spots_indices:
+            row = free_spots_indices.index(self._selected_spot_index)
+            self.free_spots_display.setCurrentIndex(self._free_spots_model.index(row))
+        else:
+            self._selected_spot_index = None
+            self.free_spot_highlight_requested.emit(-1)
 
     @Slot(str)
     def update_assigned_spot_info(self, message):
@@ -207,6 +232,11 @@ class ControlPanel(QWidget):
 
     @Slot(bool, bool)
     def update_assignment_buttons(self, is_assigned, is_stream_running):
+        state = (bool(is_assigned), bool(is_stream_running), self._has_free_spots)
+        if state == self._last_assign_state:
+            return
+        self._last_assign_state = state
+
         self.name_input.setEnabled(not is_assigned)
         self.car_input.setEnabled(not is_assigned)
 
@@ -231,65 +261,58 @@ class ControlPanel(QWidget):
 
     @Slot(bool)
     def update_search_status(self, is_running):
-        palette = self.search_status_indicator.palette()
-        if is_running:
-             self.search_status_indicator.setText("Status: Running")
-             palette.setColor(QPalette.ColorRole.Window, QColor(Qt.GlobalColor.darkGreen))
-             palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
-        else:
-             self.search_status_indicator.setText("Status: Idle")
-             palette.setColor(QPalette.ColorRole.Window, QColor(Qt.GlobalColor.lightGray))
-             palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.black)
-        self.search_status_indicator.setPalette(palette)
-
-    @Slot(QListWidgetItem)
-    def on_free_spot_selected(self, item):
-        if not item or not item.flags() & Qt.ItemFlag.ItemIsSelectable:
-            self.free_spot_highlight_requested.emit(-1)
+        if is_running == self._is_searching:
             return
-        item_text = item.text()
-        try:
-            spot_number = int(item_text.split(" ")[1])
-            self.free_spot_highlight_requested.emit(spot_number)
-        except (IndexError, ValueError):
-            self.free_spot_highlight_requested.emit(-1)
+        self._is_searching = is_running
+        self.find_parking_btn.setText("Stop Search" if is_running else "Find Parking")
+        self._update_find_parking_button_state()
+        self.search_status_indicator.setText("Status: Running" if is_running else "Status: Idle")
+        self.search_status_indicator.setStyleSheet(_STATUS_RUNNING_SS if is_running else _STATUS_IDLE_SS)
+
+    @Slot(QModelIndex)
+    def on_free_spot_selected(self, index):
+        row = index.row() if index.isValid() else -1
+        spot_index = self._last_free_set[row] if 0 <= row < len(self._last_free_set) else None
+        self._selected_spot_index = spot_index
+        self.free_spot_highlight_requested.emit(-1 if spot_index is None else spot_index)
 
     def on_find_parking_clicked(self):
-        current_text = self.find_parking_btn.text()
-        if "Stop" in current_text:
-            print("ControlPanel: Stop requested")
-            self.find_parking_requested.emit("STOP_REQUESTED")
+        if self._is_searching:
+            log.debug("ControlPanel: Stop requested")
+            QTimer.singleShot(0, lambda: self.find_parking_requested.emit("STOP_REQUESTED"))
         else:
              selected_mode = self.get_selected_mode()
-             print(f"ControlPanel: Emitting find_parking_requested (Mode={selected_mode})")
-             self.find_parking_requested.emit(selected_mode)
+             log.debug("ControlPanel: Emitting find_parking_requested (Mode=%s)", selected_mode)
+             QTimer.singleShot(0, lambda m=selected_mode: self.find_parking_requested.emit(m))
 
     def on_assign_spot_clicked(self):
         user_name = self.name_input.text().strip()
         car_info = self.car_input.text().strip()
         if not user_name:
-            QMessageBox.warning(self, "Input Missing", "Please enter your name before assigning a spot.")
+            self._input_warning_box.setText("Please enter your name before assigning a spot.")
+            self._input_warning_box.exec()
             self.name_input.setFocus()
             return
         if not car_info:
-            QMessageBox.warning(self, "Input Missing", "Please enter car make and model before assigning a spot.")
+            self._input_warning_box.setText("Please enter car make and model before assigning a spot.")
+            self._input_warning_box.exec()
             self.car_input.setFocus()
             return
-        print(f"ControlPanel: Emitting assign_spot_requested for '{user_name}' ('{car_info}')")
+        log.debug("ControlPanel: Emitting assign_spot_requested for '%s' ('%s')", user_name, car_info)
         self.assign_spot_requested.emit(user_name, car_info)
 
     def on_cancel_assignment_clicked(self):
-        print("ControlPanel: Emitting cancel_assignment_requested")
-        self.cancel_assignment_requested.emit()
+        log.debug("ControlPanel: Emitting cancel_assignment_requested")
+        QTimer.singleShot(0, self.cancel_assignment_requested.emit)
 
     def on_edit_rois_clicked(self):
-        print("ControlPanel: Emitting edit_rois_requested")
-        self.edit_rois_requested.emit()
+        log.debug("ControlPanel: Emitting edit_rois_requested")
+        QTimer.singleShot(0, self.edit_rois_requested.emit)
 
     def on_close_clicked(self):
-        print("ControlPanel: Emitting close_requested")
-        self.close_requested.emit()
+        log.debug("ControlPanel: Emitting close_requested")
+        QTimer.singleShot(0, self.close_requested.emit)
 
     def on_toggle_theme_clicked(self):
-        print("ControlPanel: Emitting toggle_theme_requested")
-        self.toggle_theme_requested.emit()
\ No newline at end of file
+        log.debug("ControlPanel: Emitting toggle_theme_requested")
+        QTimer.singleShot(0, self.toggle_theme_requested.emit)
\ No newline at end of file
@@ -1,10 +1,12 @@
 ## main.py
 import sys
+import logging
 from PySide6.QtWidgets import QApplication
 import qdarktheme
 from main_window import ParkFinderApp
 
 def main():
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
     app = QApplication(sys.argv)
     qdarktheme.setup_theme()
     parkfinder = ParkFinderApp()
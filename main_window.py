@@ -1,25 +1,60 @@
 # === FILE: main_window.py ===
 
-import pickle
+import hashlib
+import importlib.util
 import sys
 import os
+import shutil
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
 from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QApplication,
                                QStatusBar, QMessageBox, QSizePolicy)
 from PySide6.QtGui import QPixmap, QIcon
-from PySide6.QtCore import Slot, QTimer, QPoint
+from PySide6.QtCore import Slot, QTimer, QPoint, Qt
 
 from theme import Theme, ThemeManager
 from control_panel import ControlPanel
-from map_view import MapView, VideoThread
+from map_view import MapView
+from utilils import load_rois, apply_spot_state_changes
 
-try:
-    from roi_editor import ROIDialog
 
-    ROI_EDITOR_AVAILABLE = True
-except ImportError:
-    ROI_EDITOR_AVAILABLE = False
+class _ConfigLoader(SafeLoader):
+    pass
+
+
+@dataclass(frozen=True)
+class StreetCfg:
+    __slots__ = ('video', 'roi', 'roi_reference_image', 'model', 'detection')
+    video: Optional[str]
+    roi: Optional[str]
+    roi_reference_image: Optional[str]
+    model: Optional[str]
+    detection: dict
+
+    @classmethod
+    def from_dict(cls, street_cfg):
+        street_cfg = street_cfg or {}
+        return cls(video=street_cfg.get('video'),
+                   roi=street_cfg.get('roi'),
+                   roi_reference_image=street_cfg.get('roi_reference_image'),
+                   model=street_cfg.get('model'),
+                   detection=street_cfg.get('detection') or {})
+
+
+_EMPTY_STREET_CFG = StreetCfg.from_dict({})
+
+
+ROI_EDITOR_AVAILABLE = importlib.util.find_spec("roi_editor") is not None
+if not ROI_EDITOR_AVAILABLE:
     print("\n" + "=" * 50)
     print("=== WARNING: ROI Editor component (roi_editor.py) not found! ===")
     print("=== The 'Edit Parking Zones' button will not function.       ===")
@@ -28,21 +63,33 @@ except ImportError:
 
 class ParkFinderApp(QMainWindow):
     CONFIG_FILE = "config.yaml"
+    DEFAULT_CONFIG_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_config.yaml")
 
     def __init__(self):
         super().__init__()
+        self._config_dirty = False
+        self._config_digest = None
         self.config = self.load_config()
+        self._build_street_configs()
         self.setWindowIcon(QIcon("parkicon.ico"))
 
         self.theme_manager = ThemeManager(Theme.LIGHT)
         self.current_theme = Theme.LIGHT
 
         self.video_thread = None
+        self._thread_running = False
         self.current_polygons = []
         self.assigned_spot = -1
         self.highlighted_spot = -1
         self.last_user_info = ("", "")
         self.current_street_name = None
+        self._model_path = None
+        self._final_detection_cfg = {}
+        self._path_valid = {}
+        self._spot_states_cache = {}
+        self._free_spots = []
+        self._ui_state = {'running': False, 'searching': False}
+        self._pending_ui_sync = False
 
         self.initUI()
         self._initialize_street_dependent_settings()
@@ -50,30 +97,12 @@ class ParkFinderApp(QMainWindow):
     def load_config(self):
         if not os.path.exists(self.CONFIG_FILE):
             print(f"WARNING: Configuration file '{self.CONFIG_FILE}' not found.")
-            default_config = {
-                'global_paths': {
-                    'model': 'path/to/your/default_yolo.pt'
-                },
-                'global_detection': {
-                    'car_class_id': 2,
-                    'confidence_threshold': 0.35
-                },
-                'streets': {
-                    'Main Street': {
-                        'video': 'path/to/your/main_video.mp4',
-                        'roi': 'path/to/your/main_rois.pkl',
-                        'roi_reference_image': 'path/to/your/main_reference.png'
-                    },
-                }
-            }
             try:
-                with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                    yaml.dump(default_config, f, default_flow_style=False, sort_keys=False)
+                shutil.copyfile(self.DEFAULT_CONFIG_TEMPLATE, self.CONFIG_FILE)
                 msg = (f"Default configuration file '{self.CONFIG_FILE}' created.\n"
                        f"Please edit the paths and parameters inside.")
                 print(msg)
                 QMessageBox.information(self, "Config Created", msg)
-                return default_config
             except Exception as e:
                 print(f"ERROR creating default config file: {e}")
                 QMessageBox.critical(self, "Config Error",
@@ -81,11 +110,16 @@ class ParkFinderApp(QMainWindow):
                 return {}
 
         try:
-            with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
+            with open(self.CONFIG_FILE, 'rb') as f:
+                raw_config = f.read()
+            self._config_digest = hashlib.blake2b(raw_config, digest_size=8).digest()
+            config_data = yaml.load(raw_config, Loader=_ConfigLoader)
             if not config_data:
                 print(f"ERROR: Config file '{self.CONFIG_FILE}' is empty or invalid.")
-                return self.load_config()
+                QMessageBox.critical(self, "Config Error",
+                                     f"Configuration file '{self.CONFIG_FILE}' is empty or invalid. "
+                                     f"Fix it or delete it to regenerate a default one.")
+                return {}
 
             if 'global_paths' not in config_data or \
                     'streets' not in config_data or \
@@ -95,6 +129,7 @@ class ParkFinderApp(QMainWindow):
 
             if 'detection' in config_data and 'global_detection' not in config_data:
                 config_data['global_detection'] = config_data.pop('detection')
+                self._config_dirty = True
                 print("Migrated 'detection' to 'global_detection' in config.")
 
             print(f"Configuration loaded from '{self.CONFIG_FILE}'.")
@@ -106,9 +141,17 @@ class ParkFinderApp(QMainWindow):
             return {}
 
     def save_config(self):
+        if not self._config_dirty:
+            return
         try:
-            with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, sort_keys=False)
+            raw_config = yaml.dump(self.config, Dumper=SafeDumper, default_flow_style=False,
+                                   sort_keys=False).encode('utf-8')
+            digest = hashlib.blake2b(raw_config, digest_size=8).digest()
+            if digest != self._config_digest:
+                with open(self.CONFIG_FILE, 'wb') as f:
+                    f.write(raw_config)
+                self._config_digest = digest
+            self._config_dirty = False
             self.show_status_message(f"Configuration saved to {self.CONFIG_FILE}", 3000)
             print(f"Configuration saved to {self.CONFIG_FILE}")
         except Exception as e:
@@ -116,18 +159,32 @@ class ParkFinderApp(QMainWindow):
             QMessageBox.critical(self, "Config Save Error",
                                  f"Failed to save configuration file:\n{self.CONFIG_FILE}\nError: {e}")
 
+    def _build_street_configs(self):
+        self.streets = {name: StreetCfg.from_dict(street_cfg)
+                        for name, street_cfg in (self.config.get('streets') or {}).items()}
+
     def get_street_config(self, street_name):
-        return self.config.get('streets', {}).get(street_name, {})
+        return self.streets.get(street_name, _EMPTY_STREET_CFG)
 
     def get_current_street_paths(self):
-        if not self.current_street_name: return {}
-        street_cfg = self.get_street_config(self.current_street_name)
-        return {
-            'video': street_cfg.get('video'),
-            'roi': street_cfg.get('roi'),
-            'roi_reference_image': street_cfg.get('roi_reference_image'),
-            'model': street_cfg.get('model')
-        }
+        if not self.current_street_name: return _EMPTY_STREET_CFG
+        return self.get_street_config(self.current_street_name)
+
+    def _update_street_detection_settings(self):
+        street_cfg = self.get_current_street_paths()
+        self._model_path = street_cfg.model or self.config.get('global_paths', {}).get('model')
+        self._final_detection_cfg = {'car_class_id': 2, 'confidence_threshold': 0.35,
+                                     **self.config.get('global_detection', {}),
+                                     **street_cfg.detection}
+        self._path_valid = {}
+
+    def _path_exists(self, key, path):
+        # Positive results are cached per street; misses are re-checked so files added later are picked up.
+        if not path:
+            return False
+        if not self._path_valid.get(key):
+            self._path_valid[key] = os.path.exists(path)
+        return self._path_valid[key]
 
     def initUI(self):
         self.setWindowTitle('AuraPark')
@@ -151,6 +208,7 @@ class ParkFinderApp(QMainWindow):
             self.current_street_name = None
 
         self.map_view = MapView(main_window_ref=self)
+        self.map_view.update_spot_states_slot(self._spot_states_cache)
         main_layout.addWidget(self.control_panel)
         main_layout.addWidget(self.map_view, 1)
         main_widget.setLayout(main_layout)
@@ -170,6 +228,7 @@ class ParkFinderApp(QMainWindow):
         self.control_panel.street_changed_signal.connect(self.handle_street_change)
 
     def _initialize_street_dependent_settings(self):
+        self._update_street_detection_settings()
         if not self.current_street_name:
             self.show_status_message("No street selected or configured.", 5000)
             self.current_polygons = []
@@ -182,19 +241,20 @@ class ParkFinderApp(QMainWindow):
         if self.current_street_name == street_name: return
 
         self.show_status_message(f"Street changed to: {street_name}", 3000)
-        if self.video_thread and self.video_thread.isRunning():
+        if self._thread_running:
             self.stop_video_stream()
             if self.assigned_spot != -1:
                 self.handle_cancel_assignment(show_message=False)
             self.control_panel.update_free_spots({})
-            self.map_view.spot_states = {}
+            self._reset_spot_states()
             self.map_view.video_display.setPixmap(QPixmap())
             self.map_view.video_display.setText("Video stream stopped due to street change.")
 
         self.current_street_name = street_name
+        self._update_street_detection_settings()
         self.current_polygons = []
         self.load_initial_rois()
-        self.control_panel.update_assignment_buttons(is_assigned=(self.assigned_spot != -1), is_stream_running=False)
+        self._request_ui_sync(is_stream_running=False)
 
     def load_initial_rois(self):
         if not self.current_street_name:
@@ -203,10 +263,9 @@ class ParkFinderApp(QMainWindow):
             self.map_view.update_polygons_slot([])
             return
 
-        street_paths = self.get_current_street_paths()
-        current_roi_path = street_paths.get('roi')
+        current_roi_path = self.get_current_street_paths().roi
 
-        if not current_roi_path or not os.path.exists(current_roi_path):
+        if not self._path_exists('roi', current_roi_path):
             msg = (f"ROI file path not set or file not found for street '{self.current_street_name}'.\n"
                    f"Expected at: {current_roi_path}\n"
                    f"Check config file or use 'Edit Parking Zones'.")
@@ -216,20 +275,14 @@ class ParkFinderApp(QMainWindow):
             self.map_view.update_polygons_slot([])
             return
         try:
-            with open(current_roi_path, 'rb') as f:
-                loaded_data = pickle.load(f)
-            if isinstance(loaded_data, list) and \
-                    all(isinstance(p, list) and len(p) == 4 and \
-                        all(isinstance(pt, tuple) and len(pt) == 2 for pt in p) for p in loaded_data):
-                self.current_polygons = loaded_data
-                msg = f"Loaded {len(self.current_polygons)} ROIs for '{self.current_street_name}' from {os.path.basename(current_roi_path)}"
-                self.show_status_message(msg, 3000)
-                print(msg)
-                self.map_view.update_polygons_slot(self.current_polygons)
-                if not self.current_polygons:
-                    self.show_status_message(f"WARNING: ROI file for '{self.current_street_name}' is empty.", 5000)
-            else:
-                raise TypeError("Invalid data format in ROI file.")
+            # load_rois validates the file (an (N, 4, 2) integer layout) and raises on anything else.
+            self.current_polygons = load_rois(current_roi_path)
+            msg = f"Loaded {len(self.current_polygons)} ROIs for '{self.current_street_name}' from {os.path.basename(current_roi_path)}"
+            self.show_status_message(msg, 3000)
+            print(msg)
+            self.map_view.update_polygons_slot(self.current_polygons)
+            if not self.current_polygons:
+                self.show_status_message(f"WARNING: ROI file for '{self.current_street_name}' is empty.", 5000)
         except Exception as e:
             QMessageBox.critical(self, "Error Loading ROIs",
                                  f"Could not load ROIs for '{self.current_street_name}' from {current_roi_path}:\n{e}")
@@ -252,56 +305,35 @@ class ParkFinderApp(QMainWindow):
         start_stream = True
 
         current_street_config = self.get_street_config(self.current_street_name)
-        video_path = current_street_config.get('video')
-        roi_path_for_checks = current_street_config.get('roi')
-
-        model_path_to_use = current_street_config.get('model', self.config.get('global_paths', {}).get('model'))
-
-        street_detection_cfg = current_street_config.get('detection')
-        global_detection_cfg_template = self.config.get('global_detection', {})
-
-        final_detection_cfg = {}
-        if street_detection_cfg:
-            final_detection_cfg['car_class_id'] = street_detection_cfg.get('car_class_id',
-                                                                           global_detection_cfg_template.get(
-                                                                               'car_class_id', 2))
-            final_detection_cfg['confidence_threshold'] = street_detection_cfg.get('confidence_threshold',
-                                                                                   global_detection_cfg_template.get(
-                                                                                       'confidence_threshold', 0.35))
-        else:
-            final_detection_cfg = global_detection_cfg_template.copy()
-            if 'car_class_id' not in final_detection_cfg: final_detection_cfg['car_class_id'] = 2
-            if 'confidence_threshold' not in final_detection_cfg: final_detection_cfg['confidence_threshold'] = 0.35
+        video_path = current_street_config.video
+        roi_path_for_checks = current_street_config.roi
+
+        model_path_to_use = self._model_path
+        final_detection_cfg = self._final_detection_cfg
 
         print(f"[MainWindow] For street '{self.current_street_name}', using model: '{model_path_to_use}'")
         print(
             f"[MainWindow] Detection params: CarClassID={final_detection_cfg.get('car_class_id')}, ConfThresh={final_detection_cfg.get('confidence_threshold')}")
 
-        if not self.current_polygons and not video_only:
-            QMessageBox.warning(self, "ROIs Missing",
-                                f"Parking zones (ROIs) are not loaded for street '{self.current_street_name}'.\n'{selected_mode}' mode requires ROIs. Load or define them.")
-            start_stream = False
-
-        if start_stream and (not video_path or not os.path.exists(video_path)):
-            QMessageBox.critical(self, "Video Error",
-                                 f"Video file path for street '{self.current_street_name}' not found or invalid: {video_path}")
-            start_stream = False
-
-        if start_stream and yolo_enabled and not video_only:
-            if not model_path_to_use or not os.path.exists(model_path_to_use):
-                QMessageBox.critical(self, "Model Error",
-                                     f"YOLO model file path not found or invalid for street '{self.current_street_name}': {model_path_to_use}")
+        street = self.current_street_name
+        stream_checks = (
+            (lambda: not video_only and not self.current_polygons, QMessageBox.warning, "ROIs Missing",
+             f"Parking zones (ROIs) are not loaded for street '{street}'.\n'{selected_mode}' mode requires ROIs. Load or define them."),
+            (lambda: not self._path_exists('video', video_path), QMessageBox.critical, "Video Error",
+             f"Video file path for street '{street}' not found or invalid: {video_path}"),
+            (lambda: yolo_enabled and not self._path_exists('model', model_path_to_use), QMessageBox.critical, "Model Error",
+             f"YOLO model file path not found or invalid for street '{street}': {model_path_to_use}"),
+            (lambda: not video_only and not self._path_exists('roi', roi_path_for_checks), QMessageBox.critical,
+             "ROI File Error", f"ROI file path for street '{street}' not found or invalid: {roi_path_for_checks}"),
+        )
+        for check_failed, show_message_box, title, message in stream_checks:
+            if check_failed():
+                show_message_box(self, title, message)
                 start_stream = False
+                break
 
-        if start_stream and not video_only and (not roi_path_for_checks or not os.path.exists(roi_path_for_checks)):
-            QMessageBox.critical(self, "ROI File Error",
-                                 f"ROI file path for street '{self.current_street_name}' not found or invalid: {roi_path_for_checks}")
-            start_stream = False
-
-        is_running = self.video_thread is not None and self.video_thread.isRunning()
-        self.control_panel.update_assignment_buttons(is_assigned=(self.assigned_spot != -1),
-                                                     is_stream_running=is_running or start_stream)
-        self.control_panel.update_search_status(is_running or start_stream)
+        is_running = self._thread_running
+        self._request_ui_sync(is_stream_running=is_running or start_stream, is_searching=is_running or start_stream)
 
         if start_stream:
             if self.assigned_spot != -1: self.handle_cancel_assignment(show_message=False)
@@ -318,11 +350,13 @@ class ParkFinderApp(QMainWindow):
 
     def start_video_stream(self, video_path_street, roi_path_street, model_path_to_use, detection_cfg, yolo_enabled,
                            video_only):
-        if self.video_thread is not None and self.video_thread.isRunning():
+        if self._thread_running:
             QMessageBox.information(self, "Already Running", "Search is already running.")
             return
         self.stop_video_stream()
 
+        from map_view import VideoThread
+
         print(
             f"MainWindow: Starting video thread for street '{self.current_street_name}' using model '{model_path_to_use}'")
         self.video_thread = VideoThread(
@@ -334,22 +368,23 @@ class ParkFinderApp(QMainWindow):
             video_only_mode=video_only
         )
 
+        self._reset_spot_states()
         self.video_thread.set_assigned_spot(self.assigned_spot)
         self.video_thread.set_highlighted_spot(self.highlighted_spot)
 
-        self.video_thread.update_frame.connect(self.map_view.update_frame_slot)
-        self.video_thread.update_spot_states.connect(self.handle_spot_states_update)
-        self.video_thread.status_update.connect(self.show_status_message)
+        queued = Qt.ConnectionType.QueuedConnection
+        self.video_thread.update_frame.connect(self.map_view.update_frame_slot, queued)
+        self.video_thread.update_spot_states.connect(self.handle_spot_states_update, queued)
+        self.video_thread.status_update.connect(self.show_status_message, queued)
         self.video_thread.finished.connect(self.on_video_thread_finished)
+        self._thread_running = True
         self.video_thread.start()
 
-        self.control_panel.find_parking_btn.setText("Stop Search")
         self.show_status_message(f"Starting video processing for {self.current_street_name}...", 0)
-        self.control_panel.update_assignment_buttons(is_assigned=(self.assigned_spot != -1), is_stream_running=True)
-        self.control_panel.update_search_status(True)
+        self._request_ui_sync(is_stream_running=True, is_searching=True)
 
     def stop_video_stream(self):
-        if self.video_thread is not None and self.video_thread.isRunning():
+        if self._thread_running:
             print("MainWindow: Stopping video thread...")
             self.show_status_message("Stopping video processing...", 0)
             self.video_thread.stop()
@@ -358,20 +393,38 @@ class ParkFinderApp(QMainWindow):
                 self.video_thread.terminate()
                 self.video_thread.wait()
             print("MainWindow: Video thread stopped.")
+        self._thread_running = False
         self.video_thread = None
 
-    @Slot(list)
-    def handle_spot_states_update(self, spot_states_list):
-        spot_states = dict(spot_states_list)
-        self.map_view.update_spot_states_slot(spot_states)
-        self.control_panel.update_free_spots(spot_states)
+    def _reset_spot_states(self):
+        self._spot_states_cache.clear()
+        self._free_spots.clear()
 
-        is_running = self.video_thread is not None and self.video_thread.isRunning()
+    def _request_ui_sync(self, is_stream_running, is_searching=None):
+        self._ui_state['running'] = is_stream_running
+        if is_searching is not None:
+            self._ui_state['searching'] = is_searching
+        if not self._pending_ui_sync:
+            self._pending_ui_sync = True
+            QTimer.singleShot(0, self._sync_ui_state)
+
+    @Slot()
+    def _sync_ui_state(self):
+        self._pending_ui_sync = False
         self.control_panel.update_assignment_buttons(is_assigned=(self.assigned_spot != -1),
-                                                     is_stream_running=is_running)
+                                                     is_stream_running=self._ui_state['running'])
+        self.control_panel.update_search_status(self._ui_state['searching'])
 
-        if self.assigned_spot != -1 and spot_states.get(self.assigned_spot) == 'occupied':
-            spot_that_became_occupied = self.assigned_spot
+    @Slot(list)
+    def handle_spot_states_update(self, changed_spot_states):
+        spot_that_became_occupied = apply_spot_state_changes(changed_spot_states, self._spot_states_cache,
+                                                             self._free_spots, self.assigned_spot)
+        self.control_panel.update_free_spots(self._spot_states_cache)
+
+        is_running = self._thread_running
+        self._request_ui_sync(is_stream_running=is_running)
+
+        if spot_that_became_occupied != -1:
             user_name, car_info = self.last_user_info
             self.handle_cancel_assignment(show_message=False)
             reply = QMessageBox.question(self, "Spot Taken!",
@@ -382,7 +435,7 @@ class ParkFinderApp(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 self.show_status_message(
                     f"Spot {spot_that_became_occupied} taken. Finding a new spot for {user_name}...", 3000)
-                QTimer.singleShot(100, lambda u=user_name, c=car_info: self.handle_assign_spot(u, c))
+                QTimer.singleShot(100, partial(self.handle_assign_spot, user_name, car_info))
             else:
                 self.show_status_message(f"Spot {spot_that_became_occupied} assignment cancelled.", 3000)
                 self.control_panel.update_assigned_spot_info(
@@ -391,14 +444,12 @@ class ParkFinderApp(QMainWindow):
     @Slot()
     def on_video_thread_finished(self):
         print("MainWindow: Video thread finished signal received.")
+        self._thread_running = False
         self.handle_highlight_request(-1)
-        self.control_panel.find_parking_btn.setText("Find Parking")
-        self.control_panel._update_find_parking_button_state()
-        self.control_panel.update_assignment_buttons(is_assigned=(self.assigned_spot != -1), is_stream_running=False)
-        self.control_panel.update_search_status(False)
+        self._request_ui_sync(is_stream_running=False, is_searching=False)
         self.map_view.video_display.setText("Video stream stopped.")
         self.map_view.video_display.setPixmap(QPixmap())
-        self.map_view.spot_states = {}
+        self._reset_spot_states()
         self.control_panel.update_free_spots({})
         self.show_status_message("Video processing finished or stopped.", 3000)
 
@@ -410,21 +461,17 @@ class ParkFinderApp(QMainWindow):
         if self.assigned_spot != -1:
             QMessageBox.information(self, "Already Assigned", f"You already have spot {self.assigned_spot}.")
             return
-        if not self.video_thread or not self.video_thread.isRunning():
+        if not self._thread_running:
             QMessageBox.warning(self, "Search Not Running", "Start 'Find Parking' before assigning.")
             return
-        found_spot = -1
-        for spot_index, status in sorted(self.map_view.spot_states.items()):
-            if status == 'free':
-                found_spot = spot_index
-                break
+        found_spot = self._free_spots[0] if self._free_spots else -1
         if found_spot != -1:
             self.assigned_spot = found_spot
             if self.highlighted_spot == self.assigned_spot: self.handle_highlight_request(-1)
             if self.video_thread: self.video_thread.set_assigned_spot(self.assigned_spot)
             assignment_message = f"<b>Assigned Spot: {self.assigned_spot}</b> ({self.current_street_name})<br>User: {user_name}<br>Car: {car_info}"
             self.control_panel.update_assigned_spot_info(assignment_message)
-            self.control_panel.update_assignment_buttons(is_assigned=True, is_stream_running=True)
+            self._request_ui_sync(is_stream_running=True)
             self.show_status_message(
                 f"Spot {self.assigned_spot} on {self.current_street_name} assigned to {user_name}.", 5000)
             print(f"Spot {self.assigned_spot} assigned.")
@@ -432,7 +479,7 @@ class ParkFinderApp(QMainWindow):
             QMessageBox.information(self, "No Free Spots",
                                     f"Sorry, no free spots are available on {self.current_street_name} right now.")
             self.control_panel.update_assigned_spot_info("Assignment failed: No free spots found.")
-            self.control_panel.update_assignment_buttons(is_assigned=False, is_stream_running=True)
+            self._request_ui_sync(is_stream_running=True)
 
     @Slot(bool)
     def handle_cancel_assignment(self, show_message=True):
@@ -441,10 +488,10 @@ class ParkFinderApp(QMainWindow):
             print(f"MainWindow: Cancelling assignment for spot {spot_to_cancel} on street '{self.current_street_name}'")
             self.assigned_spot = -1
             self.last_user_info = ("", "")
-            if self.video_thread and self.video_thread.isRunning(): self.video_thread.set_assigned_spot(-1)
+            if self._thread_running: self.video_thread.set_assigned_spot(-1)
             self.control_panel.update_assigned_spot_info("Assigned spot: -")
-            is_running = self.video_thread is not None and self.video_thread.isRunning()
-            self.control_panel.update_assignment_buttons(is_assigned=False, is_stream_running=is_running)
+            is_running = self._thread_running
+            self._request_ui_sync(is_stream_running=is_running)
             if show_message:
                 QMessageBox.information(self, "Assignment Cancelled",
                                         f"Assignment for spot {spot_to_cancel} on {self.current_street_name} has been cancelled.")
@@ -455,7 +502,7 @@ class ParkFinderApp(QMainWindow):
     def handle_highlight_request(self, spot_index):
         if self.highlighted_spot != spot_index:
             self.highlighted_spot = spot_index
-            if self.video_thread and self.video_thread.isRunning():
+            if self._thread_running:
                 self.video_thread.set_highlighted_spot(self.highlighted_spot)
 
     @Slot()
@@ -469,7 +516,7 @@ class ParkFinderApp(QMainWindow):
 
         self.show_status_message(f"Opening ROI Editor for {self.current_street_name}...", 0)
         was_running = False
-        if self.video_thread and self.video_thread.isRunning():
+        if self._thread_running:
             reply = QMessageBox.question(self, "Stop Video Processing?",
                                          "Video processing must be stopped to edit parking zones.\nStop now?",
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -484,13 +531,14 @@ class ParkFinderApp(QMainWindow):
                 return
 
         current_street_paths = self.get_current_street_paths()
-        roi_path_for_street = current_street_paths.get('roi')
-        ref_image_path_for_street = current_street_paths.get('roi_reference_image')
+        roi_path_for_street = current_street_paths.roi
+        ref_image_path_for_street = current_street_paths.roi_reference_image
 
         if not ref_image_path_for_street or not os.path.exists(ref_image_path_for_street):
             QMessageBox.warning(self, "Reference Image Missing",
                                 f"Reference image for street '{self.current_street_name}' not found or not configured: {ref_image_path_for_street}\nROI Editor might not function correctly.")
         try:
+            from roi_editor import ROIDialog
             dialog = ROIDialog(config=self.config, current_roi_path=roi_path_for_street,
                                current_reference_image_path=ref_image_path_for_street, parent=self)
             dialog.rois_saved.connect(self.handle_rois_saved)
@@ -510,6 +558,10 @@ class ParkFinderApp(QMainWindow):
             f"ROIs for '{self.current_street_name}' saved to {os.path.basename(new_roi_path)}. Reloading...", 3000)
         if self.current_street_name in self.config.get('streets', {}):
             self.config['streets'][self.current_street_name]['roi'] = new_roi_path
+            self._config_dirty = True
+            self.streets[self.current_street_name] = StreetCfg.from_dict(
+                self.config['streets'][self.current_street_name])
+            self._path_valid.pop('roi', None)
             self.save_config()
         else:
             QMessageBox.warning(self, "Config Warning",
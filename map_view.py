@@ -5,23 +5,23 @@ from PySide6.QtWidgets import QAbstractItemView
 from PySide6.QtCore import QThread, Signal, Qt, Slot, QPoint, QRect
 from PySide6.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QPolygon
 import cv2
-import torch
-import pickle
 import numpy as np
-from ultralytics import YOLO
+import queue
+import threading
 import time
 import os
 import traceback
 
 try:
-    from utilils import YOLO_Detection, drawPolygons
+    from utilils import YOLO_Detection, drawPolygons, load_roi_array, assign_centers_to_rois
 
     print("Successfully imported functions from utilils.py for map_view")
 except ImportError as e:
     print(f"ERROR: Could not import from utilils.py in map_view. {e}")
 
 
-    def YOLO_Detection(model, frame, conf=0.35, car_class_id=2):
+    def YOLO_Detection(model, frame, conf=0.35, car_class_id=2, imgsz=None, half=False, box_scale=None,
+                       as_numpy=False):
         return [], [], {}, []
 
 
@@ -29,6 +29,64 @@ except ImportError as e:
         return frame, {}, 0, set()
 
 
+    def load_roi_array(path):
+        return np.empty((0, 4, 2), dtype=np.int32)
+
+
+    def assign_centers_to_rois(boxes, roi_label):
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty, empty
+
+
+# SPAI_DEBUG_VISUAL=1 enables the trainer1.mp4 trace, sampled once every DEBUG_VISUAL_EVERY_N_FRAMES frames.
+DEBUG_VISUAL = os.environ.get('SPAI_DEBUG_VISUAL', '0') == '1'
+DEBUG_VISUAL_EVERY_N_FRAMES = 300
+
+# Last loaded detector, reused when the stream is restarted or the street changes but the model does not.
+_model_cache = {}
+
+
+class FramePrefetcher:
+    # Decodes upcoming frames on a helper thread so decode overlaps with inference and drawing.
+    # With latest_only, a frame the consumer has not picked up yet is replaced instead of queued behind.
+    def __init__(self, read_frame, depth=2, latest_only=False):
+        self._read_frame = read_frame
+        self._latest_only = latest_only
+        self._frames = queue.Queue(maxsize=1 if latest_only else depth)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                ret, frame = self._read_frame()
+            except Exception as e:
+                print(f"FramePrefetcher: read failed: {e}")
+                ret, frame = False, None
+            while not self._stopped.is_set():
+                try:
+                    self._frames.put((ret, frame), block=not self._latest_only, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._latest_only:
+                        try:
+                            self._frames.get_nowait()
+                        except queue.Empty:
+                            pass
+            if not ret:
+                break
+
+    def read(self):
+        return self._frames.get()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
 class VideoThread(QThread):
     update_frame = Signal(QImage)
     update_spot_states = Signal(list)
@@ -37,9 +95,17 @@ class VideoThread(QThread):
     def __init__(self, video_path, roi_path, model_path, detection_config,
                  yolo_enabled=False, video_only_mode=False):
         super().__init__()
+        import torch
+        from ultralytics import YOLO
+
         self.running = True
+        self.fp16 = False
         try:
             self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            if self.device.type == 'cuda':
+                torch.backends.cudnn.benchmark = True
+                # Tensor cores (compute capability 7.0+) run FP16 at roughly twice the FP32 rate.
+                self.fp16 = torch.cuda.get_device_capability(self.device)[0] >= 7
         except Exception as e:
             print(f"ERROR initializing torch device: {e}. Defaulting to CPU.")
             traceback.print_exc()
@@ -49,8 +115,11 @@ class VideoThread(QThread):
         self.frame_height = 0
         self.model = None
         self.posList = []
+        self._posList_np = []
+        self._roi_label = None
         self.assigned_spot_index = -1
         self.highlighted_spot_index = -1
+        self._last_spot_states = {}
 
         self.video_path_street = video_path
         self.roi_path_street = roi_path
@@ -58,6 +127,22 @@ class VideoThread(QThread):
 
         self.car_class_id = detection_config.get('car_class_id', 2)
         self.confidence_threshold = detection_config.get('confidence_threshold', 0.35)
+        self.inference_size = detection_config.get('inference_size')
+        self.detect_every_n_frames = max(1, int(detection_config.get('detect_every_n_frames', 3)))
+        self.frame_budget = 1.0 / max(1.0, float(detection_config.get('target_fps', 30)))
+        self._cached_detections = ([], [], [], np.empty((0, 2), np.float32), np.empty(0, np.int32))
+        self._counter_strip_values = None
+        self._counter_strip = None
+        self.export_tensorrt = detection_config.get('export_tensorrt', False)
+        self.tensorrt_int8_data = detection_config.get('tensorrt_int8_data')
+        self.gpu_preprocess = detection_config.get('gpu_preprocess', False)
+        self._gpu_input_size = None
+        self._gpu_box_scale = None
+        self._torch = torch
+        self.debug_visual_street = DEBUG_VISUAL or detection_config.get('debug_visual_street', False)
+        self.gpu_decode = detection_config.get('gpu_decode', False)
+        self.drop_stale_frames = detection_config.get('drop_stale_frames', False)
+        self.gpu_reader = None
 
         self.effective_yolo_enabled = (yolo_enabled and
                                        not video_only_mode and
@@ -78,7 +163,12 @@ class VideoThread(QThread):
         try:
             if self.effective_yolo_enabled:
                 self.status_update.emit(f"Loading YOLO model from: {self.model_path_global}")
-                self.model = YOLO(self.model_path_global).to(self.device)
+                model_key = (os.path.abspath(self.model_path_global), str(self.device), self.inference_size,
+                             self.export_tensorrt)
+                self.model = _model_cache.get(model_key)
+                if self.model is None:
+                    _model_cache.clear()
+                    self.model = _model_cache[model_key] = self._load_model(YOLO)
                 if hasattr(self.model, 'names'):
                     self.class_names = self.model.names
                     self.status_update.emit(f"YOLO model loaded. Class names: {self.class_names}")
@@ -94,8 +184,8 @@ class VideoThread(QThread):
                 if self.roi_path_street and os.path.exists(self.roi_path_street):
                     self.status_update.emit(f"Loading parking positions from: {self.roi_path_street}")
                     try:
-                        with open(self.roi_path_street, 'rb') as f:
-                            self.posList = pickle.load(f)
+                        self._posList_np = list(load_roi_array(self.roi_path_street))
+                        self.posList = self._posList_np
                         self.status_update.emit(f"Loaded {len(self.posList)} parking positions for current street.")
                         print(f"[VideoThread INIT DEBUG] Loaded {len(self.posList)} ROIs from {self.roi_path_street}")
                         if not self.posList:
@@ -121,6 +211,7 @@ class VideoThread(QThread):
             else:
                 self.status_update.emit(f"Opening video source: {self.video_path_street}")
                 self.cap = cv2.VideoCapture(self.video_path_street)
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                 if not self.cap.isOpened():
                     self.status_update.emit(f"ERROR: Could not open video file: {self.video_path_street}")
                     self.running = False
@@ -128,11 +219,123 @@ class VideoThread(QThread):
                     self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                     self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                     self.status_update.emit(f"Video opened. Frame: {self.frame_width}x{self.frame_height}")
+                    if self.posList:
+                        self._roi_label = self._build_roi_label_map()
+                    if self.gpu_decode:
+                        self.gpu_reader = self._open_gpu_reader()
+                    if self.gpu_preprocess and self.model is not None:
+                        self._setup_gpu_preprocess()
         except Exception as e:
             self.status_update.emit(f"CRITICAL ERROR during VideoThread initialization: {e}")
             traceback.print_exc()
             self.running = False
 
+    def _load_model(self, YOLO):
+        if self.model_path_global.endswith('.engine'):
+            return YOLO(self.model_path_global, task='detect')
+
+        # A TensorRT engine cached next to the .pt is preferred; it runs FP16 on the GPU's tensor cores.
+        engine_path = os.path.splitext(self.model_path_global)[0] + '.engine'
+        if not os.path.exists(engine_path) and self.export_tensorrt and self.device.type == 'cuda':
+            export_kwargs = {'imgsz': self.inference_size} if self.inference_size else {}
+            if self.tensorrt_int8_data:
+                # INT8 (e.g. Jetson/edge) needs a calibration dataset YAML.
+                export_kwargs.update(int8=True, data=self.tensorrt_int8_data)
+            else:
+                export_kwargs['half'] = True
+            self.status_update.emit(f"Exporting TensorRT engine to: {engine_path}")
+            try:
+                engine_path = YOLO(self.model_path_global).export(format='engine', device=0, dynamic=False, batch=1,
+                                                                  **export_kwargs)
+            except Exception as e:
+                print(f"[VideoThread INIT DEBUG] TensorRT export failed, using PyTorch model: {e}")
+        if engine_path and os.path.exists(engine_path):
+            print(f"[VideoThread INIT DEBUG] Using TensorRT engine: {engine_path}")
+            return YOLO(engine_path, task='detect')
+        return YOLO(self.model_path_global).to(self.device)
+
+    def _build_roi_label_map(self):
+        # Each pixel holds the index of the ROI covering it (-1 for none), so detections are matched by lookup.
+        roi_label = np.full((self.frame_height, self.frame_width), -1, dtype=np.int32)
+        for area_idx, area_np in enumerate(self._posList_np):
+            cv2.fillPoly(roi_label, [area_np], area_idx)
+        return roi_label
+
+    def _open_gpu_reader(self):
+        if not hasattr(cv2, 'cudacodec') or cv2.cuda.getCudaEnabledDeviceCount() == 0:
+            print("[VideoThread INIT DEBUG] GPU decode requested, but OpenCV was built without CUDA video codecs.")
+            return None
+        try:
+            gpu_reader = cv2.cudacodec.createVideoReader(self.video_path_street)
+            gpu_reader.set(cv2.cudacodec.ColorFormat_BGR)
+            self.status_update.emit("Decoding video on the GPU (NVDEC).")
+            return gpu_reader
+        except Exception as e:
+            print(f"[VideoThread INIT DEBUG] GPU video reader unavailable, using CPU decode: {e}")
+            return None
+
+    def _read_frame(self):
+        if self.gpu_reader is None:
+            return self.cap.read()
+        ret, gpu_frame = self.gpu_reader.nextFrame()
+        return ret, gpu_frame.download() if ret else None
+
+    @staticmethod
+    def _render_counter_strip(occupied_count, available_count, assigned_count):
+        # The counters only change with occupancy, so they are rendered once per change and blitted every frame.
+        strip = np.zeros((41, 501, 3), dtype=np.uint8)
+        strip_mask = np.zeros((41, 501), dtype=np.uint8)
+        bg_color_cnt = (240, 240, 240)
+        for (x1, x2), text, color in (((10, 150), f"Occupied: {occupied_count}", (0, 0, 200)),
+                                      ((170, 320), f"Available: {available_count}", (0, 150, 0)),
+                                      ((340, 500), f"Assigned: {assigned_count}", (200, 0, 0))):
+            cv2.rectangle(strip, (x1, 5), (x2, 40), bg_color_cnt, -1)
+            cv2.rectangle(strip_mask, (x1, 5), (x2, 40), 255, -1)
+            cv2.putText(strip, text, (x1 + 10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1, cv2.LINE_AA)
+            cv2.putText(strip_mask, text, (x1 + 10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 255, 1, cv2.LINE_AA)
+        return strip, strip_mask.astype(bool)
+
+    def _setup_gpu_preprocess(self):
+        torch = self._torch
+        if self.device.type != 'cuda' or not isinstance(getattr(self.model, 'model', None), torch.nn.Module):
+            print("[VideoThread INIT DEBUG] GPU preprocessing needs a PyTorch model on CUDA; using Ultralytics preprocessing.")
+            return
+        if isinstance(self.inference_size, (list, tuple)):
+            input_h, input_w = self.inference_size
+        else:
+            # Long side to the inference size, both sides rounded to the model's 32 px stride.
+            scale = (self.inference_size or 640) / max(self.frame_width, self.frame_height)
+            input_h = max(32, int(round(self.frame_height * scale / 32)) * 32)
+            input_w = max(32, int(round(self.frame_width * scale / 32)) * 32)
+        self._gpu_input_size = (input_h, input_w)
+        self._gpu_box_scale = np.array([self.frame_width / input_w, self.frame_height / input_h] * 2, dtype=np.float32)
+        self.status_update.emit(f"Preprocessing frames on the GPU at {input_w}x{input_h}.")
+
+    def _preprocess_on_gpu(self, frame):
+        torch = self._torch
+        frame_gpu = torch.from_numpy(frame).to(self.device, non_blocking=True)
+        # BGR->RGB, HWC->NCHW, resize and scale to [0, 1] as one chain on the device.
+        frame_nchw = frame_gpu.flip(-1).permute(2, 0, 1).unsqueeze(0).float()
+        resized = torch.nn.functional.interpolate(frame_nchw, size=self._gpu_input_size, mode='bilinear',
+                                                  align_corners=False)
+        return resized.div_(255.0)
+
+    def _warmup_model(self):
+        # Input shape is fixed for the whole stream, so run the first (autotuning/allocating) passes before the loop.
+        # Warmup feeds the same inputs as the loop (the GPU-preprocessed tensor when enabled) so the shapes match.
+        dummy_frame = np.zeros((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+        try:
+            for _ in range(3):
+                if self._gpu_input_size:
+                    detector_input, detector_imgsz = self._preprocess_on_gpu(dummy_frame), None
+                else:
+                    detector_input, detector_imgsz = dummy_frame, self.inference_size
+                YOLO_Detection(self.model, detector_input, conf=self.confidence_threshold,
+                               car_class_id=self.car_class_id, imgsz=detector_imgsz, half=self.fp16,
+                               box_scale=self._gpu_box_scale, as_numpy=True)
+        except Exception as e:
+            print(f"[VideoThread RUN DEBUG] Model warmup failed: {e}")
+
     @Slot(int)
     def set_assigned_spot(self, spot_index):
         self.assigned_spot_index = spot_index
@@ -147,31 +350,50 @@ class VideoThread(QThread):
             if hasattr(self, 'cap') and self.cap: self.cap.release()
             return
 
+        if self.effective_yolo_enabled and self.model and self.frame_width and self.frame_height:
+            self._warmup_model()
+
         frame_count = 0
         start_time = time.time()
         self.status_update.emit("Video processing started.")
 
-        is_visual_street = self.video_path_street and "trainer1.mp4" in self.video_path_street
+        is_visual_street = (self.debug_visual_street and self.video_path_street and
+                            "trainer1.mp4" in self.video_path_street)
+
+        # When a frame overruns its time budget, the next frame skips inference (reusing the last detections);
+        # a skipped detection is then run on the first frame that is not skipped.
+        skip_detection = False
+        detection_pending = False
+
+        prefetcher = FramePrefetcher(self._read_frame, latest_only=self.drop_stale_frames)
+        prefetcher.start()
 
         while self.running:
-            ret, frame = self.cap.read()
+            ret, frame = prefetcher.read()
             if not ret:
                 self.status_update.emit("End of video or read error. Stopping thread.")
                 self.running = False
                 break
 
+            frame_start = time.perf_counter()
             try:
-                processed_frame = frame.copy()
+                detection_due = detection_pending or frame_count % self.detect_every_n_frames == 0
+                run_detection = detection_due and not skip_detection
+                detection_pending = detection_due and skip_detection
+                trace_visual_street = is_visual_street and frame_count % DEBUG_VISUAL_EVERY_N_FRAMES == 0
+                # Detection runs before any drawing, so the decoded buffer can be drawn on directly.
+                processed_frame = frame
                 spot_states = {}
                 occupied_count = 0
                 all_detected_boxes = []
                 detected_classes = []
                 detected_confidences = []
-                detection_centers_inside = []
+                centers_xy = np.empty((0, 2), np.float32)
+                centers_box_idx = np.empty(0, np.int32)
                 drawn_spot_box_indices = set()
 
-                if self.effective_yolo_enabled and self.model:
-                    if is_visual_street:
+                if self.effective_yolo_enabled and self.model and run_detection:
+                    if trace_visual_street:
                         debug_conf_thresh = 0.1
                         print(
                             f"[VideoThread RUN DEBUG VisualStreet] === RAW MODEL PREDICT (conf={debug_conf_thresh}, ALL CLASSES) ===")
@@ -188,48 +410,55 @@ class VideoThread(QThread):
                                 f"[VideoThread RUN DEBUG VisualStreet] Raw model predict (all classes, low conf={debug_conf_thresh}) returned no detections.")
                         print(f"[VideoThread RUN DEBUG VisualStreet] === END RAW MODEL PREDICT ===")
 
+                    if self._gpu_input_size:
+                        detector_input, detector_imgsz = self._preprocess_on_gpu(frame), None
+                    else:
+                        detector_input, detector_imgsz = frame, self.inference_size
                     boxes, classes, _, confidences = YOLO_Detection(
                         self.model,
-                        frame,
+                        detector_input,
                         conf=self.confidence_threshold,
-                        car_class_id=self.car_class_id
+                        car_class_id=self.car_class_id,
+                        imgsz=detector_imgsz,
+                        half=self.fp16,
+                        box_scale=self._gpu_box_scale,
+                        as_numpy=True
                     )
                     all_detected_boxes = boxes
                     detected_classes = classes
                     detected_confidences = confidences
-                    if is_visual_street:
+                    if trace_visual_street:
                         print(
                             f"[VideoThread RUN DEBUG VisualStreet] YOLO_Detection Output - Boxes Found: {len(all_detected_boxes)}, Classes Detected: {detected_classes}, CarClassID used: {self.car_class_id}, ConfThresh: {self.confidence_threshold}")
 
-                    if self.posList and all_detected_boxes:
-                        for i_box, box_coords in enumerate(all_detected_boxes):
-                            x1, y1, x2, y2 = box_coords
-                            center_x = int((x1 + x2) / 2)
-                            center_y = int((y1 + y2) / 2)
-                            center_point = (center_x, center_y)
-                            for area_idx, area_points in enumerate(self.posList):
-                                try:
-                                    if isinstance(area_points, list) and len(area_points) >= 3:
-                                        area_np = np.array(area_points, dtype=np.int32)
-                                        if cv2.pointPolygonTest(area_np, center_point, False) >= 0:
-                                            detection_centers_inside.append((center_x, center_y, i_box))
-                                except Exception as poly_err:
-                                    print(f"Error checking point in polygon ROI idx {area_idx}: {poly_err}")
-                        if is_visual_street:
+                    if self.posList and len(all_detected_boxes) and self._roi_label is not None:
+                        centers_x, centers_y, roi_indices = assign_centers_to_rois(all_detected_boxes,
+                                                                                   self._roi_label)
+                        centers_box_idx = np.flatnonzero(roi_indices >= 0).astype(np.int32)
+                        centers_xy = np.column_stack((centers_x[centers_box_idx],
+                                                      centers_y[centers_box_idx])).astype(np.float32)
+                        if trace_visual_street:
                             print(
-                                f"[VideoThread RUN DEBUG VisualStreet] Detection centers inside ROIs: {detection_centers_inside}")
+                                f"[VideoThread RUN DEBUG VisualStreet] Detection centers inside ROIs: {np.column_stack((centers_xy, centers_box_idx)).astype(int).tolist()}")
+                    self._cached_detections = (all_detected_boxes, detected_classes, detected_confidences,
+                                               centers_xy, centers_box_idx)
+                elif self.effective_yolo_enabled and self.model:
+                    # Occupancy changes far slower than the frame rate, so in-between frames reuse the last detections.
+                    (all_detected_boxes, detected_classes, detected_confidences,
+                     centers_xy, centers_box_idx) = self._cached_detections
 
                 if not self.effective_video_only_mode and self.posList:
                     processed_frame, spot_states, occupied_count, drawn_spot_box_indices = drawPolygons(
                         frame=processed_frame,
-                        points_list=self.posList,
-                        detection_centers_inside=detection_centers_inside,
+                        points_list=self._posList_np,
+                        centers_xy=centers_xy,
+                        centers_box_idx=centers_box_idx,
                         detected_boxes=all_detected_boxes,
                         assigned_spot_index=self.assigned_spot_index,
                         highlight_spot_index=self.highlighted_spot_index,
                         show_status_text=True
                     )
-                    if is_visual_street:
+                    if trace_visual_street:
                         print(f"[VideoThread RUN DEBUG VisualStreet] Spot states from drawPolygons: {spot_states}")
                 elif not self.effective_video_only_mode and not self.posList:
                     cv2.putText(processed_frame, "ROIs not loaded for this street", (50, 50),
@@ -237,17 +466,20 @@ class VideoThread(QThread):
                     spot_states = {}
                     occupied_count = 0
 
-                if self.effective_yolo_enabled and all_detected_boxes:
+                if self.effective_yolo_enabled and len(all_detected_boxes):
                     general_bbox_color = (0, 150, 255)
-                    for i, box in enumerate(all_detected_boxes):
-                        if i not in drawn_spot_box_indices:
-                            x1, y1, x2, y2 = map(int, box)
-                            cv2.rectangle(processed_frame, (x1, y1), (x2, y2), general_bbox_color, 2)
-                            if i < len(detected_classes) and i < len(detected_confidences) and self.class_names:
+                    unmatched = [i for i in range(len(all_detected_boxes)) if i not in drawn_spot_box_indices]
+                    if unmatched:
+                        x1s, y1s, x2s, y2s = np.asarray(all_detected_boxes, dtype=np.float32).reshape(-1, 4)[
+                            unmatched].astype(np.int32).T
+                        # All rectangles outlined in one polylines call; same pixels as per-box cv2.rectangle.
+                        rect_contours = np.stack([x1s, y1s, x2s, y1s, x2s, y2s, x1s, y2s], axis=1).reshape(-1, 4, 2)
+                        cv2.polylines(processed_frame, rect_contours, True, general_bbox_color, 2)
+                        if self.class_names and len(detected_classes) == len(detected_confidences) == len(all_detected_boxes):
+                            class_names = self.class_names
+                            for i, x1, y1 in zip(unmatched, x1s.tolist(), y1s.tolist()):
                                 class_id = int(detected_classes[i])
-                                class_name = self.class_names.get(class_id, f"ID:{class_id}")
-                                conf = detected_confidences[i]
-                                label = f"{class_name} {conf:.2f}"
+                                label = f"{class_names.get(class_id, f'ID:{class_id}')} {detected_confidences[i]:.2f}"
                                 cv2.putText(processed_frame, label, (x1, y1 - 10),
                                             cv2.FONT_HERSHEY_SIMPLEX, 0.5, general_bbox_color, 1, cv2.LINE_AA)
 
@@ -256,27 +488,31 @@ class VideoThread(QThread):
                     assigned_count = 1 if self.assigned_spot_index != -1 and total_spots > 0 else 0
                     available_count = max(0, total_spots - occupied_count - assigned_count)
 
-                    text_color_cnt = (0, 0, 0)
-                    bg_color_cnt = (240, 240, 240)
-                    cv2.rectangle(processed_frame, (10, 5), (150, 40), bg_color_cnt, -1)
-                    cv2.putText(processed_frame, f"Occupied: {occupied_count}", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
-                                (0, 0, 200), 1, cv2.LINE_AA)
-                    cv2.rectangle(processed_frame, (170, 5), (320, 40), bg_color_cnt, -1)
-                    cv2.putText(processed_frame, f"Available: {available_count}", (180, 30), cv2.FONT_HERSHEY_SIMPLEX,
-                                0.6, (0, 150, 0), 1, cv2.LINE_AA)
-                    cv2.rectangle(processed_frame, (340, 5), (500, 40), bg_color_cnt, -1)
-                    cv2.putText(processed_frame, f"Assigned: {assigned_count}", (350, 30), cv2.FONT_HERSHEY_SIMPLEX,
-                                0.6, (200, 0, 0), 1, cv2.LINE_AA)
-
-                frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = frame_rgb.shape
+                    counter_values = (occupied_count, available_count, assigned_count)
+                    if counter_values != self._counter_strip_values:
+                        self._counter_strip = self._render_counter_strip(*counter_values)
+                        self._counter_strip_values = counter_values
+                    strip, strip_mask = self._counter_strip
+                    region = processed_frame[:strip.shape[0], :strip.shape[1]]
+                    region_h, region_w = region.shape[:2]
+                    np.copyto(region, strip[:region_h, :region_w], where=strip_mask[:region_h, :region_w, None])
+
+                h, w, ch = processed_frame.shape
                 bytes_per_line = ch * w
-                qt_image = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+                qt_image = QImage(processed_frame.data, w, h, bytes_per_line, QImage.Format.Format_BGR888)
 
-                self.update_frame.emit(qt_image.copy())
+                # processed_frame is a fresh array every frame and PySide keeps it alive for as long as the
+                # (implicitly shared) QImage data lives, so the image can be emitted without a deep copy.
+                self.update_frame.emit(qt_image)
                 if not self.effective_video_only_mode:
-                    self.update_spot_states.emit(list(spot_states.items()) if spot_states else [])
-
+                    last_spot_states = self._last_spot_states
+                    changed_spot_states = [(spot_index, status) for spot_index, status in spot_states.items()
+                                           if last_spot_states.get(spot_index) != status]
+                    if changed_spot_states or frame_count == 0:
+                        self.update_spot_states.emit(changed_spot_states)
+                        self._last_spot_states = spot_states
+
+                skip_detection = time.perf_counter() - frame_start > self.frame_budget
                 frame_count += 1
                 if frame_count % 30 == 0:
                     current_time = time.time()
@@ -285,11 +521,11 @@ class VideoThread(QThread):
                     self.status_update.emit(f"Processing... FPS: {fps:.1f}")
 
             except Exception as e:
-                current_frame_num = self.cap.get(cv2.CAP_PROP_POS_FRAMES) if hasattr(self, 'cap') and self.cap else -1
-                self.status_update.emit(f"ERROR processing frame #{int(current_frame_num)}: {e}")
+                self.status_update.emit(f"ERROR processing frame #{frame_count + 1}: {e}")
                 traceback.print_exc()
                 continue
 
+        prefetcher.stop()
         self.status_update.emit("Video processing stopped.")
         if hasattr(self, 'cap') and self.cap:
             self.cap.release()
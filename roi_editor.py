@@ -2,7 +2,6 @@
 
 import sys
 import cv2
-import pickle
 import numpy as np
 import os
 # import yaml # Не потрібен тут напряму
@@ -10,8 +9,10 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                                QLabel, QFileDialog, QMessageBox, QSizePolicy,
                                QAbstractScrollArea)
 from PySide6.QtGui import (QPixmap, QImage, QPainter, QPen, QColor, QPolygon, QBrush,
-                           QPainterPath)
-from PySide6.QtCore import Qt, Signal, QPoint, QRect, Slot, QSize
+                           QPainterPath, QFont, QFontMetrics)
+from PySide6.QtCore import Qt, Signal, QPoint, QRect, Slot, QSize, QTimer
+
+from utilils import load_roi_array, save_rois
 
 
 class RoiLabel(QLabel):
@@ -32,12 +33,35 @@ class RoiLabel(QLabel):
         self.setMouseTracking(True)
 
         self.current_polygon_points = []
-        self.image_pixmap = None
+        self.image_np = None
+        self._scaled_buf = None
         self.scale_factor = 1.0
         self.offset = QPoint(0, 0)
 
         self.hovered_roi_index = -1
         self.selected_roi_index = -1
+        self._label_qpolys = []
+        self._label_bboxes = []
+        self._number_positions = []
+        self._number_pixmaps = []
+        self._number_pixmaps_ratio = 0.0
+        self._roi_layer_pixmap = None
+        self._badge_key = None
+        self._badge_pixmap = None
+
+        # While the window is being resized, interim sizes get a fast rescale; the smooth one runs once it settles.
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(50)
+        self._resize_timer.timeout.connect(self._update_display)
+
+        # Same idea while the user is drawing/hovering: rescales stay fast until the mouse has been idle for a moment.
+        self._interactive = False
+        self._smooth_pending = False
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(200)
+        self._idle_timer.timeout.connect(self._on_interaction_idle)
 
         self.existing_roi_color = QColor(0, 0, 255, 100)
         self.hover_roi_color = QColor(255, 255, 0, 150)
@@ -46,13 +70,17 @@ class RoiLabel(QLabel):
         self.number_text_color = Qt.GlobalColor.white
 
     def set_image(self, image_path):
-        pixmap = QPixmap(image_path)
-        if pixmap.isNull():
+        # np.fromfile + imdecode (unlike cv2.imread) copes with non-ASCII paths on Windows.
+        try:
+            image_np = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except (OSError, ValueError):
+            image_np = None
+        if image_np is None:
             self.setText(f"Failed to load image:\n{image_path}")
-            self.image_pixmap = None
+            self.image_np = None
             self._update_display()
             return False
-        self.image_pixmap = pixmap
+        self.image_np = image_np
         self.hovered_roi_index = -1
         self.selected_roi_index = -1
         self.roi_selected.emit(-1)
@@ -62,22 +90,32 @@ class RoiLabel(QLabel):
         self.update()
         return True
 
-    def _update_display(self):
-        if not self.image_pixmap or self.image_pixmap.isNull():
+    def _mark_interactive(self):
+        self._interactive = True
+        self._idle_timer.start()
+
+    def _on_interaction_idle(self):
+        self._interactive = False
+        if self._smooth_pending:
+            self._update_display()
+
+    def _update_display(self, transform_mode=None, rebuild_rois=True):
+        if transform_mode is None:
+            transform_mode = (Qt.TransformationMode.FastTransformation if self._interactive
+                              else Qt.TransformationMode.SmoothTransformation)
+        self._smooth_pending = transform_mode == Qt.TransformationMode.FastTransformation
+        if self.image_np is None:
             self.setText("Load an image to start defining ROIs")
             self.setPixmap(QPixmap())
             self.scale_factor = 1.0
             self.offset = QPoint(0, 0)
+            self._label_qpolys = []
+            self._label_bboxes = []
             return
 
         self.setText("")
         label_size = self.size()
-        scaled_pixmap = self.image_pixmap.scaled(label_size, Qt.AspectRatioMode.KeepAspectRatio,
-                                                 Qt.TransformationMode.SmoothTransformation)
-        self.setPixmap(scaled_pixmap)
-
-        original_width = self.image_pixmap.width()
-        original_height = self.image_pixmap.height()
+        original_height, original_width = self.image_np.shape[:2]
         lw = label_size.width()
         lh = label_size.height()
 
@@ -86,24 +124,110 @@ class RoiLabel(QLabel):
         else:
             self.scale_factor = 1.0
 
+        # Resample with OpenCV (area averaging for downscales) and hand Qt the result wrapped, not re-scaled.
+        target_w = max(1, round(original_width * self.scale_factor))
+        target_h = max(1, round(original_height * self.scale_factor))
+        if transform_mode == Qt.TransformationMode.FastTransformation:
+            interpolation = cv2.INTER_NEAREST
+        else:
+            interpolation = cv2.INTER_AREA if self.scale_factor < 1.0 else cv2.INTER_LINEAR
+        if self._scaled_buf is None or self._scaled_buf.shape[:2] != (target_h, target_w):
+            self._scaled_buf = np.empty((target_h, target_w, 3), dtype=np.uint8)
+        cv2.resize(self.image_np, (target_w, target_h), dst=self._scaled_buf, interpolation=interpolation)
+        scaled_image = QImage(self._scaled_buf.data, target_w, target_h, self._scaled_buf.strides[0],
+                              QImage.Format.Format_BGR888)
+        self.setPixmap(QPixmap.fromImage(scaled_image))
+
         scaled_w_real = original_width * self.scale_factor
         scaled_h_real = original_height * self.scale_factor
         self.offset = QPoint(int((lw - scaled_w_real) / 2), int((lh - scaled_h_real) / 2))
+        if rebuild_rois:
+            self._rebuild_label_polys()
+
+    def _rebuild_label_polys(self):
+        # Label-space polygons only change with the ROI list or the image scale/offset, not per mouse/paint event.
+        if self.image_np is None or self.scale_factor == 0 or not self.parent_dialog:
+            self._label_qpolys = []
+            self._label_bboxes = []
+            self._number_positions = []
+            self._roi_layer_pixmap = None
+            return
+        label_np = self._label_coords_np(self.parent_dialog._pos_np)
+        self._label_qpolys = [QPolygon([QPoint(x, y) for x, y in polygon]) for polygon in label_np.tolist()]
+        # Widened by the 2 px highlight pen so a repaint of this rect fully covers the ROI's outline.
+        self._label_bboxes = [qpolygon.boundingRect().adjusted(-2, -2, 2, 2) for qpolygon in self._label_qpolys]
+        self._rebuild_roi_layer()
+
+    def _remove_label_poly(self, index):
+        # Drop one ROI's label-space polygon instead of re-transforming the rest; only the layer and number
+        # positions (the numbers after it shift down by one) are redrawn.
+        del self._label_qpolys[index]
+        del self._label_bboxes[index]
+        self._rebuild_roi_layer()
+
+    def _rebuild_roi_layer(self):
+        # All ROIs in their plain style, plus the spot numbers, rendered once into a transparent backing pixmap.
+        # paintEvent blits it and only draws the hovered/selected ROI and the polygon being drawn on top.
+        pixel_ratio = self.devicePixelRatioF()
+        self._ensure_number_pixmaps(len(self._label_qpolys), pixel_ratio)
+        self._number_positions = []
+        normal_path = QPainterPath()
+        normal_path.setFillRule(Qt.FillRule.WindingFill)
+        for i, qpolygon in enumerate(self._label_qpolys):
+            normal_path.addPolygon(qpolygon)
+            normal_path.closeSubpath()
+            number_size = self._number_pixmaps[i].deviceIndependentSize().toSize()
+            self._number_positions.append(
+                qpolygon.boundingRect().center() - QPoint(number_size.width() // 2, number_size.height() // 2))
+
+        layer = QPixmap(self.size() * pixel_ratio)
+        layer.setDevicePixelRatio(pixel_ratio)
+        layer.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(layer)
+        painter.setPen(QPen(Qt.GlobalColor.blue, 1))
+        painter.setBrush(QBrush(self.existing_roi_color))
+        painter.drawPath(normal_path)
+        for position, number_pixmap in zip(self._number_positions, self._number_pixmaps):
+            painter.drawPixmap(position, number_pixmap)
+        painter.end()
+        self._roi_layer_pixmap = layer
+
+    def _ensure_number_pixmaps(self, count, pixel_ratio):
+        # Spot numbers don't depend on the ROI geometry or image scale: each outlined label is rendered once.
+        if pixel_ratio != self._number_pixmaps_ratio:
+            self._number_pixmaps = []
+            self._number_pixmaps_ratio = pixel_ratio
+        if len(self._number_pixmaps) >= count: return
+        font = QFont(self.font())
+        font.setPointSize(10)
+        font.setBold(True)
+        font_metrics = QFontMetrics(font)
+        for i in range(len(self._number_pixmaps), count):
+            number_text = str(i + 1)
+            text_rect = font_metrics.boundingRect(number_text).adjusted(-2, -2, 2, 2)
+            number_path = QPainterPath()
+            number_path.addText(-text_rect.x(), -text_rect.y(), font, number_text)
+            number_pixmap = QPixmap(text_rect.size() * pixel_ratio)
+            number_pixmap.setDevicePixelRatio(pixel_ratio)
+            number_pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(number_pixmap)
+            # Antialiasing only matters for the glyph outlines; the ROI fills are drawn without it.
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            painter.setPen(QPen(Qt.GlobalColor.black, 1))
+            painter.drawPath(number_path)
+            painter.fillPath(number_path, QBrush(self.number_text_color))
+            painter.end()
+            self._number_pixmaps.append(number_pixmap)
 
     def mousePressEvent(self, event):
-        if not self.image_pixmap: return
+        if self.image_np is None: return
+        self._mark_interactive()
         click_pos = event.position().toPoint()
 
+        dialog = self.parent_dialog
         clicked_on_existing = -1
-        if self.parent_dialog and self.parent_dialog.posList:
-            for i in range(len(self.parent_dialog.posList) - 1, -1, -1):
-                polygon_orig = self.parent_dialog.posList[i]
-                polygon_label = self.get_label_coords(polygon_orig)
-                if not polygon_label: continue
-                qpolygon = QPolygon(polygon_label)
-                if qpolygon.containsPoint(click_pos, Qt.FillRule.OddEvenFill):
-                    clicked_on_existing = i
-                    break
+        if dialog and dialog.posList:
+            clicked_on_existing = self._find_hit(click_pos, dialog)
 
         if event.button() == Qt.MouseButton.LeftButton:
             if clicked_on_existing != -1:
@@ -140,7 +264,10 @@ class RoiLabel(QLabel):
                 self.update()
 
     def mouseMoveEvent(self, event):
-        if not self.image_pixmap or not self.parent_dialog or not self.parent_dialog.posList:
+        if self.image_np is not None:
+            self._mark_interactive()
+        dialog = self.parent_dialog
+        if self.image_np is None or not dialog or not dialog.posList:
             if self.hovered_roi_index != -1:
                 self.hovered_roi_index = -1
                 self.roi_hovered.emit(-1)
@@ -148,109 +275,123 @@ class RoiLabel(QLabel):
             return
 
         pos = event.position().toPoint()
-        current_hover = -1
-        for i in range(len(self.parent_dialog.posList) - 1, -1, -1):
-            polygon_orig = self.parent_dialog.posList[i]
-            polygon_label = self.get_label_coords(polygon_orig)
-            if not polygon_label: continue
-            qpolygon = QPolygon(polygon_label)
-            if qpolygon.containsPoint(pos, Qt.FillRule.OddEvenFill):
-                current_hover = i
-                break
-        if current_hover != self.hovered_roi_index:
+        current_hover = self._find_hit(pos, dialog)
+        previous_hover = self.hovered_roi_index
+        if current_hover != previous_hover:
+            # Only the previously and newly hovered ROIs change on screen.
+            dirty = self._roi_rect(previous_hover).united(self._roi_rect(current_hover))
             self.hovered_roi_index = current_hover
-            self.roi_hovered.emit(self.hovered_roi_index)
-            self.update()
+            self.roi_hovered.emit(current_hover)
+            self.update(dirty)
+
+    def _roi_rect(self, index):
+        return self._label_bboxes[index] if 0 <= index < len(self._label_bboxes) else QRect()
+
+    def _find_hit(self, pos, dialog):
+        # Bounding boxes (in image coords, widened by a label pixel for rounding) cut the exact tests to a few candidates.
+        scale_factor = self.scale_factor
+        if scale_factor == 0: return -1
+        bbox = dialog._bbox
+        offset = self.offset
+        px = (pos.x() - offset.x()) / scale_factor
+        py = (pos.y() - offset.y()) / scale_factor
+        margin = 1.0 / scale_factor + 1.0
+        candidates = np.flatnonzero((bbox[:, 0] - margin <= px) & (px <= bbox[:, 2] + margin) &
+                                    (bbox[:, 1] - margin <= py) & (py <= bbox[:, 3] + margin))
+        if not candidates.size: return -1
+        contours = dialog._cv_contours
+        for i in candidates[::-1].tolist():
+            if cv2.pointPolygonTest(contours[i], (px, py), False) >= 0:
+                return i
+        return -1
 
     def paintEvent(self, event):
         super().paintEvent(event)
-        if not self.image_pixmap: return
+        if self.image_np is None: return
 
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        if self.parent_dialog and self.parent_dialog.posList:
-            for i, polygon_orig in enumerate(self.parent_dialog.posList):
-                polygon_label = self.get_label_coords(polygon_orig)
-                if not polygon_label: continue
-                qpolygon = QPolygon(polygon_label)
-                pen_width = 1
-                poly_brush_color = self.existing_roi_color
-                poly_pen_color = Qt.GlobalColor.blue
-                if i == self.selected_roi_index:
-                    poly_brush_color = self.selected_roi_color
-                    poly_pen_color = Qt.GlobalColor.green
-                    pen_width = 2
-                elif i == self.hovered_roi_index:
-                    poly_brush_color = self.hover_roi_color
-                    poly_pen_color = Qt.GlobalColor.yellow
-                    pen_width = 2
-                painter.setPen(QPen(poly_pen_color, pen_width))
-                painter.setBrush(QBrush(poly_brush_color))
-                painter.drawPolygon(qpolygon)
-                center = qpolygon.boundingRect().center()
-                font = painter.font()
-                font.setPointSize(10)
-                font.setBold(True)
-                painter.setFont(font)
-                path = QPainterPath()
-                text_rect = painter.fontMetrics().boundingRect(str(i + 1))
-                text_center_offset = QPoint(-text_rect.width() // 2, text_rect.height() // 4)
-                path.addText(center + text_center_offset, painter.font(), str(i + 1))
-                painter.setPen(QPen(Qt.GlobalColor.black, 1))
-                painter.drawPath(path)
-                painter.setPen(self.number_text_color)
-                painter.fillPath(path, painter.pen().brush())
-
-        if self.current_polygon_points:
+
+        dialog = self.parent_dialog
+        roi_count = len(dialog.posList) if dialog else 0
+        dirty_rect = event.rect()
+        if roi_count and self._roi_layer_pixmap is not None:
+            painter.drawPixmap(0, 0, self._roi_layer_pixmap)
+            label_qpolys = self._label_qpolys
+            label_bboxes = self._label_bboxes
+            selected_index = self.selected_roi_index
+            hovered_index = self.hovered_roi_index if self.hovered_roi_index != selected_index else -1
+            for i, poly_brush_color, poly_pen_color in (
+                    (hovered_index, self.hover_roi_color, Qt.GlobalColor.yellow),
+                    (selected_index, self.selected_roi_color, Qt.GlobalColor.green)):
+                if 0 <= i < len(label_qpolys) and dirty_rect.intersects(label_bboxes[i]):
+                    painter.setPen(QPen(poly_pen_color, 2))
+                    painter.setBrush(QBrush(poly_brush_color))
+                    painter.drawPolygon(label_qpolys[i])
+                    painter.drawPixmap(self._number_positions[i], self._number_pixmaps[i])
+
+        current_points = self.current_polygon_points
+        if current_points:
             pen_points = QPen(self.drawing_roi_color, 5, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
             pen_lines = QPen(self.drawing_roi_color, 2, Qt.PenStyle.DotLine)
-            painter.setPen(pen_points)
-            for point in self.current_polygon_points:
-                painter.drawPoint(point)
-            if len(self.current_polygon_points) > 1:
-                painter.setPen(pen_lines)
-                painter.drawPolyline(QPolygon(self.current_polygon_points))
-            if len(self.current_polygon_points) == 3:
-                painter.drawLine(self.current_polygon_points[-1], self.current_polygon_points[0])
-            if self.parent_dialog:
-                num_text = f"Drawing Spot {len(self.parent_dialog.posList) + 1}"
-                painter.setPen(Qt.GlobalColor.black)
-                painter.setFont(self.font())
-                text_rect = painter.fontMetrics().boundingRect(num_text)
-                bg_rect = QRect(5, 5, text_rect.width() + 10, text_rect.height() + 4)
-                painter.setBrush(QColor(255, 255, 255, 180))
-                painter.setPen(Qt.NoPen)
-                painter.drawRect(bg_rect)
-                painter.setPen(Qt.GlobalColor.black)
-                painter.drawText(QPoint(10, 5 + text_rect.height()), num_text)
+            drawing_polygon = QPolygon(current_points)
+            if dirty_rect.intersects(drawing_polygon.boundingRect().adjusted(-3, -3, 3, 3)):
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+                painter.setPen(pen_points)
+                for point in current_points:
+                    painter.drawPoint(point)
+                if len(current_points) > 1:
+                    painter.setPen(pen_lines)
+                    painter.drawPolyline(drawing_polygon)
+                if len(current_points) == 3:
+                    painter.drawLine(current_points[-1], current_points[0])
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+            if dialog:
+                num_text = f"Drawing Spot {roi_count + 1}"
+                painter.drawPixmap(5, 5, self._drawing_badge(num_text))
         painter.end()
 
+    def _drawing_badge(self, text):
+        # The "Drawing Spot N" badge only changes with N, so it is rendered once per text instead of per paint.
+        pixel_ratio = self.devicePixelRatioF()
+        if self._badge_key != (text, pixel_ratio):
+            font_metrics = QFontMetrics(self.font())
+            text_rect = font_metrics.boundingRect(text)
+            badge = QPixmap(QSize(text_rect.width() + 10, text_rect.height() + 4) * pixel_ratio)
+            badge.setDevicePixelRatio(pixel_ratio)
+            badge.fill(QColor(255, 255, 255, 180))
+            painter = QPainter(badge)
+            painter.setFont(self.font())
+            painter.setPen(Qt.GlobalColor.black)
+            painter.drawText(QPoint(5, text_rect.height()), text)
+            painter.end()
+            self._badge_key = (text, pixel_ratio)
+            self._badge_pixmap = badge
+        return self._badge_pixmap
+
     def resizeEvent(self, event):
-        self._update_display()
+        # Interim sizes only get the image preview; the ROIs are re-transformed and their layer re-rendered once,
+        # when the debounced resize timer fires.
+        self._update_display(Qt.TransformationMode.FastTransformation, rebuild_rois=False)
+        self._resize_timer.start()
         super().resizeEvent(event)
 
     def get_original_coords_tuples(self, label_points_qpoint):
-        if not self.image_pixmap or self.image_pixmap.isNull() or self.scale_factor == 0: return []
-        original_coords = []
-        img_w = self.image_pixmap.width()
-        img_h = self.image_pixmap.height()
-        for p in label_points_qpoint:
-            orig_x = int((p.x() - self.offset.x()) / self.scale_factor)
-            orig_y = int((p.y() - self.offset.y()) / self.scale_factor)
-            orig_x = max(0, min(orig_x, img_w - 1))
-            orig_y = max(0, min(orig_y, img_h - 1))
-            original_coords.append((orig_x, orig_y))
-        return original_coords
+        if self.image_np is None or self.scale_factor == 0: return []
+        img_h, img_w = self.image_np.shape[:2]
+        label_np = np.array([(p.x(), p.y()) for p in label_points_qpoint], dtype=np.float64).reshape(-1, 2)
+        original_np = ((label_np - (self.offset.x(), self.offset.y())) / self.scale_factor).astype(np.int32)
+        np.clip(original_np, 0, (img_w - 1, img_h - 1), out=original_np)
+        return [tuple(pt) for pt in original_np.tolist()]
+
+    def _label_coords_np(self, original_coords):
+        # int32 label-space coordinates for an (..., 2) array of image coordinates.
+        return (np.asarray(original_coords, dtype=np.float64) * self.scale_factor +
+                (self.offset.x(), self.offset.y())).astype(np.int32)
 
     def get_label_coords(self, original_coords_tuples):
-        if not self.image_pixmap or self.image_pixmap.isNull() or self.scale_factor == 0: return []
-        label_points = []
-        for x, y in original_coords_tuples:
-            label_x = int(x * self.scale_factor + self.offset.x())
-            label_y = int(y * self.scale_factor + self.offset.y())
-            label_points.append(QPoint(label_x, label_y))
-        return label_points
+        if self.image_np is None or self.scale_factor == 0: return []
+        label_np = self._label_coords_np(np.asarray(original_coords_tuples).reshape(-1, 2))
+        return [QPoint(x, y) for x, y in label_np.tolist()]
 
     def clear_selection_and_drawing(self):
         self.current_polygon_points = []
@@ -269,6 +410,9 @@ class ROIDialog(QDialog):
         super().__init__(parent)
         self.roi_file_path = current_roi_path
         self.posList = []
+        self._pos_np = np.empty((0, 4, 2), dtype=np.float32)
+        self._bbox = np.empty((0, 4), dtype=np.float32)
+        self._cv_contours = self._pos_np.reshape(-1, 4, 1, 2)
         self.reference_image_path = current_reference_image_path
         self.selected_roi_index = -1
 
@@ -325,6 +469,15 @@ class ROIDialog(QDialog):
             self.status_label.setText(msg)
             print(msg)  # Для консолі, якщо QMessageBox не видно відразу
 
+    def _sync_roi_arrays(self, roi_array=None):
+        # NumPy mirror of posList: (N, 4, 2) points and (N, 4) x0/y0/x1/y1 bounding boxes for hit-testing.
+        source = self.posList if roi_array is None else roi_array
+        self._pos_np = np.asarray(source, dtype=np.float32).reshape(-1, 4, 2)
+        self._bbox = np.concatenate([self._pos_np.min(axis=1), self._pos_np.max(axis=1)], axis=1)
+        # (N, 4, 1, 2) view: one cv2 contour per ROI for pointPolygonTest.
+        self._cv_contours = self._pos_np.reshape(-1, 4, 1, 2)
+        self.roi_label._rebuild_label_polys()
+
     def load_image(self):
         start_dir = os.path.dirname(self.reference_image_path) if self.reference_image_path else ""
         filepath, _ = QFileDialog.getOpenFileName(self, "Open Reference Image", start_dir,
@@ -333,6 +486,7 @@ class ROIDialog(QDialog):
             if self.roi_label.set_image(filepath):
                 self.reference_image_path = filepath
                 self.posList = []
+                self._sync_roi_arrays()
                 self.roi_label.clear_selection_and_drawing()
                 self.status_label.setText(
                     f"Loaded new reference: {os.path.basename(filepath)}. ROIs cleared. Redraw or load ROIs.")
@@ -352,28 +506,28 @@ class ROIDialog(QDialog):
         if not self.roi_file_path or not os.path.exists(self.roi_file_path):
             print(f"ROI file path invalid or file not found: {self.roi_file_path}")
             self.posList = []
+            self._sync_roi_arrays()
             self.roi_label.clear_selection_and_drawing()
             return
 
+        roi_array = None
         try:
-            with open(self.roi_file_path, 'rb') as f:
-                loaded_list = pickle.load(f)
-            if isinstance(loaded_list, list) and \
-                    all(isinstance(p, list) and len(p) == 4 and \
-                        all(isinstance(pt, tuple) and len(pt) == 2 for pt in p) for p in loaded_list):
-                self.posList = loaded_list
-                print(f"Loaded {len(self.posList)} ROIs from {self.roi_file_path}")
-                self.status_label.setText(
-                    f"Loaded {len(self.posList)} ROIs from {os.path.basename(self.roi_file_path)}. Draw or select ROIs.")
-            else:
+            roi_array = load_roi_array(self.roi_file_path)
+            if roi_array.ndim != 3 or roi_array.shape[1:] != (4, 2):
                 raise TypeError("Invalid data format in ROI file.")
+            self.posList = [[tuple(pt) for pt in poly] for poly in roi_array.tolist()]
+            print(f"Loaded {len(self.posList)} ROIs from {self.roi_file_path}")
+            self.status_label.setText(
+                f"Loaded {len(self.posList)} ROIs from {os.path.basename(self.roi_file_path)}. Draw or select ROIs.")
         except FileNotFoundError:
             pass  # Вже оброблено вище
         except Exception as e:
             QMessageBox.warning(self, "Error Loading ROIs", f"Could not load ROIs from {self.roi_file_path}:\n{e}")
             self.posList = []
+            roi_array = None
             self.status_label.setText(f"Error loading ROIs: {e}. Draw new ROIs.")
 
+        self._sync_roi_arrays(roi_array)
         self.roi_label.clear_selection_and_drawing()
 
     def save_rois(self):
@@ -395,8 +549,7 @@ class ROIDialog(QDialog):
             save_path += ".pkl"
 
         try:
-            with open(save_path, 'wb') as f:
-                pickle.dump(self.posList, f)
+            save_rois(save_path, self.posList)
             print(f"ROIs temporarily saved to {save_path} by ROIDialog.")
             QMessageBox.information(self, "Success",
                                     f"ROIs saved to:\n{save_path}\nMainWindow will update the configuration.")
@@ -408,6 +561,7 @@ class ROIDialog(QDialog):
     def add_polygon(self, polygon_points):
         if len(polygon_points) == 4:
             self.posList.append(polygon_points)
+            self._sync_roi_arrays()
             self.status_label.setText(f"ROI {len(self.posList)} added. Draw next or select.")
             print(f"Polygon {len(self.posList)} added to ROIDialog.posList.")
             self.roi_label.update()
@@ -451,7 +605,12 @@ class ROIDialog(QDialog):
                                          QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
                 removed_roi_index = self.selected_roi_index
-                self.posList.pop(removed_roi_index)
+                del self.posList[removed_roi_index]
+                self._pos_np = np.delete(self._pos_np, removed_roi_index, axis=0)
+                self._bbox = np.delete(self._bbox, removed_roi_index, axis=0)
+                self._cv_contours = self._pos_np.reshape(-1, 4, 1, 2)
+                if len(self.roi_label._label_qpolys) > removed_roi_index:
+                    self.roi_label._remove_label_poly(removed_roi_index)
                 print(f"Deleted ROI {removed_roi_index + 1} from ROIDialog.posList")
                 self.roi_label.clear_selection_and_drawing()
                 self.status_label.setText(f"ROI {removed_roi_index + 1} deleted. {len(self.posList)} ROIs remaining.")
@@ -466,6 +625,7 @@ class ROIDialog(QDialog):
                                          QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
                 self.posList = []
+                self._sync_roi_arrays()
                 print("All ROIs cleared from ROIDialog.posList.")
                 self.roi_label.clear_selection_and_drawing()
                 self.status_label.setText("All ROIs cleared. Draw new ROIs.")
@@ -1,8 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from ultralytics import YOLO
 import cv2
+import torch
 
 model_path = "D:/PyProjects/car-parking-system/runs/detect/train5/weights/best.pt"
 video_path = "D:/PyProjects/car-parking-system/trainer1.mp4"
+batch_size = 16
+max_frames = 100
+
+
+def read_batch(cap, count):
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    return frames
+
 
 try:
     model = YOLO(model_path)
@@ -13,28 +29,37 @@ try:
         print(f"Error: Could not open video {video_path}")
         exit()
 
-    frame_count = 0
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            print("End of video or error reading frame.")
-            break
+    use_cuda = torch.cuda.is_available()
+    predict_kwargs = dict(conf=0.1, verbose=False, half=use_cuda, device=0 if use_cuda else "cpu")
 
-        frame_count += 1
+    frame_count = 0
+    # Decode the next batch on a worker thread while the current one runs through the model.
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        pending = reader.submit(read_batch, cap, min(batch_size, max_frames + 1))
+        while True:
+            frames = pending.result()
+            if not frames:
+                print("End of video or error reading frame.")
+                break
+            remaining = max_frames + 1 - frame_count - len(frames)
+            if remaining > 0:
+                pending = reader.submit(read_batch, cap, min(batch_size, remaining))
 
-        results = model.predict(source=frame, conf=0.1, verbose=True)
+            results = model.predict(source=frames, **predict_kwargs)
 
-        if results and results[0].boxes:
-            num_detections = len(results[0].boxes)
-            print(f"Frame {frame_count}: Found {num_detections} detections (conf=0.1, all classes)")
-            if num_detections > 0:
-                print(f"  Classes found: {list(set(results[0].boxes.cls.tolist()))}")
-        else:
-            print(f"Frame {frame_count}: No detections (conf=0.1, all classes)")
+            for result in results:
+                frame_count += 1
+                if result.boxes:
+                    num_detections = len(result.boxes)
+                    print(f"Frame {frame_count}: Found {num_detections} detections (conf=0.1, all classes)")
+                    if num_detections > 0:
+                        print(f"  Classes found: {torch.unique(result.boxes.cls).cpu().tolist()}")
+                else:
+                    print(f"Frame {frame_count}: No detections (conf=0.1, all classes)")
 
-        if frame_count > 100:
-            print("Reached 100 frames, stopping test.")
-            break
+            if frame_count > max_frames:
+                print(f"Reached {max_frames} frames, stopping test.")
+                break
 
     cap.release()
     # cv2.destroyAllWindows()
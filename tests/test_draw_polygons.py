@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+import utilils
+
+# Self-intersecting ("bowtie") spot: its shoelace centroid, where the labels go, lies left of its bounding box.
+BOWTIE = [[600, 300], [700, 400], [700, 320], [600, 399]]
+BOWTIE_CENTROID = (492, 338)
+SPOT = [[100, 100], [260, 100], [260, 300], [100, 300]]
+SPOT_CENTROID = (180, 200)
+
+
+class DrawPolygonsLayerReuseTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(2)]
+        utilils.reset_overlay_cache()
+
+    def _assert_labels_drawn(self, drawn, frame, centroid):
+        centroid_x, centroid_y = centroid
+        window = (slice(centroid_y - 30, centroid_y + 30), slice(centroid_x - 40, centroid_x + 40))
+        self.assertTrue((drawn[window] != frame[window]).any())
+
+    def _reused_and_redrawn(self, first_frame, frame, points_list):
+        utilils.drawPolygons(first_frame.copy(), points_list)
+        reused = utilils.drawPolygons(frame.copy(), points_list)[0]
+        utilils.reset_overlay_cache()
+        redrawn = utilils.drawPolygons(frame.copy(), points_list)[0]
+        return reused, redrawn
+
+    def test_labels_outside_spot_bbox_are_drawn(self):
+        drawn = utilils.drawPolygons(self.frames[0].copy(), [BOWTIE])[0]
+        self._assert_labels_drawn(drawn, self.frames[0], BOWTIE_CENTROID)
+
+    def test_reused_layer_keeps_labels_outside_spot_bbox(self):
+        reused, redrawn = self._reused_and_redrawn(self.frames[0], self.frames[1], [BOWTIE])
+        np.testing.assert_array_equal(reused, redrawn)
+        self._assert_labels_drawn(reused, self.frames[1], BOWTIE_CENTROID)
+
+    def test_reused_layer_covers_pixels_matching_the_first_frame(self):
+        # The first frame already holds the drawn colours: free fill, label background and white text.
+        first_frame = np.full((480, 640, 3), 220, dtype=np.uint8)
+        first_frame[110:290, 110:250] = (0, 255, 0)
+        centroid_x, centroid_y = SPOT_CENTROID
+        first_frame[centroid_y - 40:centroid_y + 25, centroid_x - 40:centroid_x + 40] = (50, 50, 50)
+        first_frame[centroid_y - 30:centroid_y - 10, centroid_x - 10:centroid_x + 10] = (255, 255, 255)
+        frame = np.full_like(first_frame, 220)
+        reused, redrawn = self._reused_and_redrawn(first_frame, frame, [SPOT])
+        np.testing.assert_array_equal(reused, redrawn)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,11 +11,17 @@ class Theme(Enum):
     DARK = "dark"
 
 class ThemeManager:
+    # Palette luminance only changes on a theme switch; None means "compute from the live palette".
+    # AUTO follows the OS theme, which can change under us, so it is never cached.
+    _is_white = None
+
     def __init__(self, theme: Theme):
         self._theme = theme
         print(f"ThemeManager: Initializing with theme: {theme.value}")
+        ThemeManager._is_white = None
         try:
             qdarktheme.setup_theme(theme.value)
+            ThemeManager._cache_is_white(theme)
             print(f"ThemeManager: Initial theme '{theme.value}' applied successfully.")
         except Exception as e:
              print(f"ERROR applying initial theme '{theme.value}': {e}", file=sys.stderr)
@@ -26,8 +32,10 @@ class ThemeManager:
     def set_theme(self, theme: Theme) -> bool:
         print(f"ThemeManager: Attempting to set theme to: {theme.value}")
         self._theme = theme
+        ThemeManager._is_white = None
         try:
             qdarktheme.setup_theme(theme.value)
+            ThemeManager._cache_is_white(theme)
             print(f"ThemeManager: Theme '{theme.value}' applied successfully.")
             return True
         except Exception as e:
@@ -37,12 +45,24 @@ class ThemeManager:
             return False
 
     @staticmethod
-    def is_white_theme() -> bool:
+    def _cache_is_white(theme: Theme):
+        if theme != Theme.AUTO:
+            ThemeManager._is_white = ThemeManager._palette_is_white()
+
+    @staticmethod
+    def _palette_is_white() -> bool:
         app = QApplication.instance()
         if app is None or not isinstance(app, QApplication):
             raise RuntimeError("QApplication is not initialized")
 
         palette = app.palette()
         color = palette.color(QPalette.ColorRole.Text)
-        y = 0.2126 * color.red() + 0.7152 * color.green() + 0.0722 * color.blue()
+        # Rec. 709 luma in 8.8 fixed point (weights sum to 256).
+        y = (54 * color.red() + 183 * color.green() + 19 * color.blue()) >> 8
         return y < 128
+
+    @staticmethod
+    def is_white_theme() -> bool:
+        if ThemeManager._is_white is not None:
+            return ThemeManager._is_white
+        return ThemeManager._palette_is_white()
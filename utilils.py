@@ -1,16 +1,123 @@
 # === FILE: utilils.py ===
 
+import bisect
+import functools
+import io
+import os
+import pickle
+
 import cv2
 import numpy as np
 
-def YOLO_Detection(model, frame, conf=0.35, car_class_id=2):
-    results = model.predict(frame, conf=conf, classes=[car_class_id])
+ROI_FILE_MAGIC = b"ROI1"
+
+
+class _RejectingUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Global '{module}.{name}' is not allowed in an ROI file")
+
+
+def save_rois(path, polygons):
+    coords = np.asarray(polygons, dtype='<i4').reshape(-1, 4, 2)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(ROI_FILE_MAGIC)
+            f.write(np.array([len(coords)], dtype='<u4').tobytes())
+            f.write(coords.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_roi_file(path):
+    with open(path, 'rb', buffering=0) as f:
+        data = f.read()
+
+    if data[:4] == ROI_FILE_MAGIC:
+        count = int(np.frombuffer(data, dtype='<u4', count=1, offset=4)[0])
+        coords = np.frombuffer(data, dtype='<i4', offset=8)
+        if coords.size != count * 8:
+            raise ValueError(f"Corrupt ROI file: header declares {count} polygons, found {coords.size} values.")
+        return coords.reshape(count, 4, 2)
+
+    # Legacy pickle: plain lists/tuples of ints only, then migrate the file to the binary format.
+    try:
+        coords = np.asarray(_RejectingUnpickler(io.BytesIO(data)).load())
+    except ValueError:
+        coords = None  # ragged nesting
+    if coords is None or (coords.size and (coords.ndim != 3 or coords.shape[1:] != (4, 2) or
+                                           not np.issubdtype(coords.dtype, np.integer))):
+        raise ValueError(f"Invalid data format in ROI file '{path}': expected a list of 4-point integer polygons.")
+    coords = coords.reshape(-1, 4, 2)
+    try:
+        save_rois(path, coords)
+        print(f"Converted legacy ROI pickle '{path}' to binary ROI format.")
+    except (OSError, ValueError, TypeError) as e:
+        print(f"WARNING: Could not convert legacy ROI file '{path}': {e}")
+    return coords
+
+
+def load_rois(path):
+    return [[tuple(pt) for pt in poly] for poly in _read_roi_file(path).tolist()]
+
+
+def load_roi_array(path):
+    # Same files as load_rois, as one contiguous (N, 4, 2) int32 array ready for cv2/NumPy consumers.
+    return _read_roi_file(path).astype(np.int32)
+
+
+def apply_spot_state_changes(changed_spot_states, spot_states, free_spots, assigned_spot_index=-1):
+    # Kept free of Qt/UI calls so it can be compiled (Cython/mypyc) without touching callers.
+    insort = bisect.insort
+    bisect_left = bisect.bisect_left
+    taken_spot_index = -1
+    for spot_index, status in changed_spot_states:
+        was_free = spot_states.get(spot_index) == 'free'
+        if status == 'free':
+            if not was_free:
+                insort(free_spots, spot_index)
+        elif was_free:
+            free_spots.pop(bisect_left(free_spots, spot_index))
+        if spot_index == assigned_spot_index and status == 'occupied':
+            taken_spot_index = spot_index
+        spot_states[spot_index] = status
+    return taken_spot_index
+
+
+def assign_centers_to_rois(boxes, roi_label):
+    # Returns box centers and, per box, the index of the ROI containing its center (-1 for none).
+    boxes_np = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    centers_x = ((boxes_np[:, 0] + boxes_np[:, 2]) / 2).astype(np.int32)
+    centers_y = ((boxes_np[:, 1] + boxes_np[:, 3]) / 2).astype(np.int32)
+    label_h, label_w = roi_label.shape
+    roi_indices = np.full(len(boxes_np), -1, dtype=np.int32)
+    in_frame = (centers_x >= 0) & (centers_x < label_w) & (centers_y >= 0) & (centers_y < label_h)
+    roi_indices[in_frame] = roi_label[centers_y[in_frame], centers_x[in_frame]]
+    return centers_x, centers_y, roi_indices
+
+
+def YOLO_Detection(model, frame, conf=0.35, car_class_id=2, imgsz=None, half=False, box_scale=None, as_numpy=False):
+    # imgsz below the model's default trades small/distant car recall for fewer FLOPs; boxes stay in frame coords.
+    # as_numpy returns (N, 4) float32 boxes, int32 classes and float32 confidences instead of Python lists.
+    predict_kwargs = {'imgsz': imgsz} if imgsz else {}
+    results = model.predict(frame, conf=conf, classes=[car_class_id], half=half, **predict_kwargs)
     if results and results[0] and hasattr(results[0], 'boxes'):
-        boxes = results[0].boxes.xyxy.tolist()
-        classes = results[0].boxes.cls.tolist()
+        # NMS already ran on the model's device; pull the packed xyxy[/id]/conf/cls block to the host in one transfer.
+        detections = results[0].boxes.data.cpu().numpy()
+        # box_scale maps boxes from a caller-resized input (e.g. a GPU-preprocessed tensor) back to frame coords.
+        boxes = detections[:, :4] * box_scale if box_scale is not None else detections[:, :4]
+        classes = detections[:, -1]
         names = results[0].names
-        confidences = results[0].boxes.conf.tolist()
-        return boxes, classes, names, confidences
+        confidences = detections[:, -2]
+        if as_numpy:
+            return (boxes.astype(np.float32, copy=False), classes.astype(np.int32), names,
+                    confidences.astype(np.float32, copy=False))
+        return boxes.tolist(), classes.tolist(), names, confidences.tolist()
+    elif as_numpy:
+        return np.empty((0, 4), np.float32), np.empty(0, np.int32), {}, np.empty(0, np.float32)
     else:
         return [], [], {}, []
 
@@ -27,8 +134,112 @@ def label_detection(frame, text, left, top, bottom, right, tbox_color=(100, 100,
                 cv2.LINE_AA)
 
 
+def _polygon_edges(polygon):
+    # Per-edge terms of the crossing-number test that only depend on the polygon: start x/y, end y, dx/dy.
+    x = polygon[:, 0].astype(np.float32)
+    y = polygon[:, 1].astype(np.float32)
+    y_next = np.roll(y, -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_slope = (np.roll(x, -1) - x) / (y_next - y)
+    return x, y, y_next, inv_slope
+
+
+def _first_center_inside(centers_x, centers_y, edges, candidates):
+    # Even-odd crossing-number test of the candidate centers against one polygon; index of the first inside, or -1.
+    x, y, y_next, inv_slope = edges
+    px = centers_x[candidates, None]
+    py = centers_y[candidates, None]
+    with np.errstate(invalid='ignore'):
+        crossings = ((y > py) != (y_next > py)) & (px < (py - y) * inv_slope + x)
+    inside = np.bitwise_xor.reduce(crossings, axis=1)
+    return int(candidates[np.argmax(inside)]) if inside.any() else -1
+
+
+# Spot geometry for the last points_list drawn: ROIs are static for a stream, so the int32 contours, centroids,
+# crossing-test edge terms and bboxes are prepared once instead of every frame. Keyed by the list object itself
+# (plus its length).
+_spot_geometry_cache = {'points_list': None, 'key': None, 'spots': [], 'bounds': None, 'bboxes': None,
+                        'quad_edges': None}
+
+
+def _spot_geometry(points_list):
+    key = len(points_list)
+    cache = _spot_geometry_cache
+    if cache['points_list'] is points_list and cache['key'] == key:
+        return cache['spots'], cache['bounds'], cache['bboxes'], cache['quad_edges']
+
+    spots = []
+    for idx, area in enumerate(points_list):
+        spot_index = idx + 1
+        try:
+            area_np = np.ascontiguousarray(area, np.int32).reshape(-1, 2)
+            if area_np.shape[0] < 3:
+                print(f"Warning: Invalid polygon data for spot index {spot_index}. Skipping.")
+                spots.append(None)
+                continue
+        except Exception as e:
+            print(f"Error processing polygon for spot index {spot_index}: {e}. Skipping.")
+            spots.append(None)
+            continue
+
+        # Shoelace (polygon area) centroid; degenerate polygons fall back to the vertex mean.
+        x = area_np[:, 0].astype(np.float64)
+        y = area_np[:, 1].astype(np.float64)
+        x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+        cross = x * y_next - x_next * y
+        double_area = cross.sum()
+        if double_area != 0:
+            centroid = (int(((x + x_next) * cross).sum() / (3 * double_area)),
+                        int(((y + y_next) * cross).sum() / (3 * double_area)))
+        else:
+            centroid = (int(np.mean(area_np[:, 0])), int(np.mean(area_np[:, 1])))
+        bbox = (*area_np.min(axis=0).tolist(), *area_np.max(axis=0).tolist())
+        spots.append((area_np, centroid, _polygon_edges(area_np), bbox, str(spot_index)))
+
+    # Per-spot (x0, y0, x1, y1) bboxes (skipped spots get an empty one) and their union, None when nothing is drawn.
+    bboxes = np.array([spot[3] if spot is not None else (np.inf, np.inf, -np.inf, -np.inf) for spot in spots],
+                      dtype=np.float32).reshape(-1, 4)
+    valid = [spot[3] for spot in spots if spot is not None]
+    bounds = (min(b[0] for b in valid), min(b[1] for b in valid),
+              max(b[2] for b in valid), max(b[3] for b in valid)) if valid else None
+    # Spots whose bbox touches another spot's can't share a batched fillPoly call (it fills overlaps even-odd).
+    with np.errstate(invalid='ignore'):
+        touching = ((bboxes[:, None, 0] <= bboxes[None, :, 2]) & (bboxes[None, :, 0] <= bboxes[:, None, 2]) &
+                    (bboxes[:, None, 1] <= bboxes[None, :, 3]) & (bboxes[None, :, 1] <= bboxes[:, None, 3]))
+    np.fill_diagonal(touching, False)
+    overlapping = touching.any(axis=1).tolist()
+    spots = [spot + (overlapping[idx],) if spot is not None else None for idx, spot in enumerate(spots)]
+    # Edge terms of all quadrilateral spots stacked as (S, 4) arrays, so every spot is tested in one NumPy pass.
+    # Other spots (and skipped ones) get NaN edges, which never cross, and keep the per-spot test.
+    quad_edges = np.full((4, len(spots), 4), np.nan, dtype=np.float32)
+    for idx, spot in enumerate(spots):
+        if spot is not None and spot[0].shape[0] == 4:
+            quad_edges[:, idx] = spot[2]
+    cache.update(points_list=points_list, key=key, spots=spots, bounds=bounds, bboxes=bboxes, quad_edges=quad_edges)
+    return spots, bounds, bboxes, quad_edges
+
+
+_STATE_FREE, _STATE_OCCUPIED, _STATE_ASSIGNED = range(3)
+
+
+# Drawn spot layer of the last frame: while the occupancy state (and everything else that shapes the drawing) is
+# unchanged, later frames only re-blend this layer instead of redrawing every fill, outline and label.
+# The layer itself stays in the drawing buffer, which is only rewritten when a frame is redrawn.
+_overlay_cache = {'spots': None, 'key': None, 'buffer': None, 'mask_buffer': None, 'mask': None}
+
+
+def reset_overlay_cache():
+    # Forgets the reusable spot layer, so the next drawPolygons call redraws everything.
+    _overlay_cache.update(spots=None, key=None)
+
+
+@functools.lru_cache(maxsize=512)
+def _text_size(text, font_scale, thickness):
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0]
+
+
 def drawPolygons(frame, points_list,
-                 detection_centers_inside=None,
+                 centers_xy=None, centers_box_idx=None,
                  detected_boxes=None,
                  occupied_color=(0, 0, 255),
                  free_color=(0, 255, 0),
@@ -38,134 +249,187 @@ def drawPolygons(frame, points_list,
                  font_color=(255, 255, 255), font_scale=0.6, font_thickness=1,
                  show_status_text=True, assigned_spot_index=-1,
                  highlight_spot_index=-1):
-    overlay = frame.copy()
     alpha = 0.35
     occupied_count = 0
     spot_states = {}
     drawn_box_indices_for_spots = set()
 
-    if detection_centers_inside is None: detection_centers_inside = []
     if detected_boxes is None: detected_boxes = []
+    # Detection centers as parallel arrays: (D, 2) x/y and, per center, the index of its box in detected_boxes.
+    centers_xy = np.asarray(centers_xy if centers_xy is not None else (), dtype=np.float32).reshape(-1, 2)
+    centers_x, centers_y = centers_xy[:, 0], centers_xy[:, 1]
+    center_box_indices = np.asarray(centers_box_idx if centers_box_idx is not None else (), dtype=np.int32)
 
-    for idx, area in enumerate(points_list):
-        spot_index = idx + 1
-        try:
-            area_np = np.array(area, np.int32)
-            if area_np.shape[0] < 3:
-                print(f"Warning: Invalid polygon data for spot index {spot_index}. Skipping.")
-                continue
-        except Exception as e:
-            print(f"Error processing polygon for spot index {spot_index}: {e}. Skipping.")
+    spots, spot_bounds, spot_bboxes, quad_edges = _spot_geometry(points_list)
+    if spot_bounds is None:
+        return frame, spot_states, occupied_count, drawn_box_indices_for_spots
+    # One (spots x centers) bbox test per frame; only spots with a center inside their bbox get the exact test.
+    spot_candidates = ((centers_x >= spot_bboxes[:, 0, None]) & (centers_x <= spot_bboxes[:, 2, None]) &
+                       (centers_y >= spot_bboxes[:, 1, None]) & (centers_y <= spot_bboxes[:, 3, None]))
+    spot_has_candidates = spot_candidates.any(axis=1).tolist()
+    # Crossing-number test of every (quad spot, candidate center) pair at once; per spot, the first center inside.
+    first_inside_quad = [-1] * len(spots)
+    if any(spot_has_candidates):
+        x, y, y_next, inv_slope = (edge[:, None, :] for edge in quad_edges)
+        px, py = centers_x[None, :, None], centers_y[None, :, None]
+        with np.errstate(invalid='ignore'):
+            crossings = ((y > py) != (y_next > py)) & (px < (py - y) * inv_slope + x)
+        quad_inside = np.bitwise_xor.reduce(crossings, axis=2) & spot_candidates
+        first_inside_quad = np.where(quad_inside.any(axis=1), quad_inside.argmax(axis=1), -1).tolist()
+    # Status labels are a fixed set (the assigned spot's is drawn one step bolder): size them once per call.
+    status_sizes = {"Free": _text_size("Free", font_scale, font_thickness),
+                    "Occupied": _text_size("Occupied", font_scale, font_thickness),
+                    "YOUR SPOT": _text_size("YOUR SPOT", font_scale, font_thickness + 1)}
+    num_font_scale, num_font_thickness = font_scale * 1.2, font_thickness + 1
+    number_y_offset = -10
+    status_y_offset = 15
+    # Text backgrounds are plain filled rectangles; the final overlay/frame blend makes them translucent.
+    text_bg_color = (50, 50, 50)
+    frame_h, frame_w = frame.shape[:2]
+    # Everything drawn lands within the spots' bounds plus room for the labels centered on their centroids (which
+    # can lie outside a self-intersecting spot) and the icon above; outside that region nothing is drawn, so only it
+    # is copied, drawn on and blended back into the frame.
+    label_w = max([size[0] for size in status_sizes.values()] +
+                  [_text_size(str(len(points_list)), num_font_scale, num_font_thickness)[0], 40])
+    label_h = _text_size("0", num_font_scale, num_font_thickness)[1]
+    pad_x, pad_y = label_w // 2 + 16, label_h + 48
+    blend_x0, blend_y0 = spot_bounds[0] - pad_x, spot_bounds[1] - pad_y
+    blend_x1, blend_y1 = spot_bounds[2] + pad_x, spot_bounds[3] + pad_y
+
+    # Per-state (status, color, status label, outline thickness), indexed by the _STATE_* constants.
+    state_styles = (("free", free_color, "Free", 2),
+                    ("occupied", occupied_color, "Occupied", 2),
+                    ("assigned", assigned_color, "YOUR SPOT", 4))
+
+    # Pass 1: occupancy and style per spot, with the contours grouped so each fill/outline style is one cv2 call.
+    fill_batches = {}
+    single_fills = []
+    outline_batches = {}
+    highlight_contours = []
+    occupying_boxes = []
+    labels = []
+    for idx, spot in enumerate(spots):
+        if spot is None:
             continue
+        spot_index = idx + 1
+        area_np, centroid, edges, _, num_text, overlapping = spot
 
         occupying_box_index = -1
         is_occupied = False
-        for center_x, center_y, box_idx in detection_centers_inside:
-            if cv2.pointPolygonTest(area_np, (float(center_x), float(center_y)), False) >= 0:
+        if spot_has_candidates[idx]:
+            if area_np.shape[0] == 4:
+                first_inside = first_inside_quad[idx]
+            else:
+                first_inside = _first_center_inside(centers_x, centers_y, edges, np.flatnonzero(spot_candidates[idx]))
+            if first_inside != -1:
                 is_occupied = True
-                occupying_box_index = box_idx
-                break
+                occupying_box_index = int(center_box_indices[first_inside])
 
         is_assigned_to_user = (spot_index == assigned_spot_index)
         is_highlighted = (spot_index == highlight_spot_index)
 
-        status = "free"
-        color = free_color
-        fill_color = free_color
-        status_text = "Free"
-        line_thickness = 2
-
-        if is_assigned_to_user:
-            status = "assigned"
-            color = assigned_color
-            fill_color = assigned_color
-            status_text = "YOUR SPOT"
-            line_thickness = 4
-        elif is_occupied:
-            status = "occupied"
-            color = occupied_color
-            fill_color = occupied_color
-            status_text = "Occupied"
-            if not is_assigned_to_user:
-                occupied_count += 1
+        state = _STATE_ASSIGNED if is_assigned_to_user else (_STATE_OCCUPIED if is_occupied else _STATE_FREE)
+        status, color, status_text, line_thickness = state_styles[state]
+        if state == _STATE_OCCUPIED:
+            occupied_count += 1
 
         spot_states[spot_index] = status
 
-        try:
-            cv2.fillPoly(overlay, [area_np], fill_color)
-            cv2.polylines(overlay, [area_np], isClosed=True, color=color, thickness=line_thickness)
-        except Exception as e:
-            print(f"Error drawing polygon graphics for spot index {spot_index}: {e}")
-            continue
-
+        if overlapping:
+            single_fills.append((area_np, color))
+        else:
+            fill_batches.setdefault(tuple(color), []).append(area_np)
+        outline_batches.setdefault((tuple(color), line_thickness), []).append(area_np)
         if is_highlighted and not is_assigned_to_user:
-            try:
-                cv2.polylines(overlay, [area_np], isClosed=True, color=highlight_color,
-                              thickness=line_thickness + 3)
-            except Exception as e:
-                print(f"Error drawing highlight for spot index {spot_index}: {e}")
-
+            highlight_contours.append((area_np, line_thickness + 3))
         if status == 'occupied' and occupying_box_index != -1 and occupying_box_index < len(detected_boxes):
             drawn_box_indices_for_spots.add(occupying_box_index)
-            try:
-                box = detected_boxes[occupying_box_index]
-                x1, y1, x2, y2 = map(int, box)
-                bbox_overlay_spot = overlay.copy()
-                cv2.rectangle(bbox_overlay_spot, (x1, y1), (x2, y2), bbox_color, 2)
-                overlay = cv2.addWeighted(bbox_overlay_spot, 0.6, overlay, 0.4, 0)
-            except Exception as e:
-                print(f"Error drawing bounding box for spot index {spot_index}: {e}")
+            x1, y1, x2, y2 = map(int, detected_boxes[occupying_box_index])
+            occupying_boxes.append((x1, y1, x2, y2))
+            blend_x0, blend_y0 = min(blend_x0, x1, x2) - 2, min(blend_y0, y1, y2) - 2
+            blend_x1, blend_y1 = max(blend_x1, x1, x2) + 2, max(blend_y1, y1, y2) + 2
+        labels.append((centroid, num_text, status_text, is_assigned_to_user))
+        blend_x0, blend_y0 = min(blend_x0, centroid[0] - pad_x), min(blend_y0, centroid[1] - pad_y)
+        blend_x1, blend_y1 = max(blend_x1, centroid[0] + pad_x), max(blend_y1, centroid[1] + pad_y)
 
-        try:
-            M = cv2.moments(area_np)
-            if M["m00"] != 0:
-                center_x = int(M["m10"] / M["m00"])
-                center_y = int(M["m01"] / M["m00"])
-            else:
-                center_x = int(np.mean(area_np[:, 0]))
-                center_y = int(np.mean(area_np[:, 1]))
+    blend_x0, blend_y0 = max(blend_x0, 0), max(blend_y0, 0)
+    blend_x1, blend_y1 = min(blend_x1 + 1, frame_w), min(blend_y1 + 1, frame_h)
+    if blend_x1 <= blend_x0 or blend_y1 <= blend_y0:
+        return frame, spot_states, occupied_count, drawn_box_indices_for_spots
+    frame_region = frame[blend_y0:blend_y1, blend_x0:blend_x1]
+
+    render_key = (frame.shape, frame.dtype, tuple(spot_states.values()), assigned_spot_index, highlight_spot_index,
+                  tuple(occupying_boxes), occupied_color, free_color, assigned_color, highlight_color, bbox_color,
+                  font_color, font_scale, font_thickness, show_status_text)
+    overlay_cache = _overlay_cache
+    overlay = overlay_cache['buffer']
+    if overlay_cache['spots'] is spots and overlay_cache['key'] == render_key:
+        blended = cv2.addWeighted(overlay[blend_y0:blend_y1, blend_x0:blend_x1], alpha, frame_region, 1 - alpha, 0)
+        cv2.copyTo(blended, overlay_cache['mask'], frame_region)
+        return frame, spot_states, occupied_count, drawn_box_indices_for_spots
 
-            number_y_offset = -10
-            status_y_offset = 15
-            bg_alpha = 0.6
+    # Drawing buffer, reused across frames; only the region around the spots is refreshed from the frame.
+    if overlay is None or overlay.shape != frame.shape or overlay.dtype != frame.dtype:
+        overlay = np.empty_like(frame)
+    blend_region = overlay[blend_y0:blend_y1, blend_x0:blend_x1]
+    np.copyto(blend_region, frame_region)
 
-            num_text = str(spot_index)
-            (num_w, num_h), _ = cv2.getTextSize(num_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale * 1.2,
-                                                font_thickness + 1)
+    # Passes 2 and 3 run twice: into the overlay, then with ink 255 into a single-channel mask of the drawn pixels.
+    # Later frames with the same state re-blend the layer through that mask, so it follows the drawn geometry
+    # rather than which pixels happened to change colour.
+    # Like the overlay, the mask buffer is kept across redraws and only its blend region is cleared.
+    mask = overlay_cache['mask_buffer']
+    if mask is None or mask.shape != frame.shape[:2]:
+        mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+    else:
+        mask[blend_y0:blend_y1, blend_x0:blend_x1] = 0
+    for canvas, ink in ((overlay, None), (mask, 255)):
+        # Pass 2: spot graphics, one call per style. Contours were validated when the spot cache was built.
+        for fill_color, contours in fill_batches.items():
+            cv2.fillPoly(canvas, contours, ink or fill_color)
+        for area_np, fill_color in single_fills:
+            cv2.fillPoly(canvas, [area_np], ink or fill_color)
+        for (color, line_thickness), contours in outline_batches.items():
+            cv2.polylines(canvas, contours, isClosed=True, color=ink or color, thickness=line_thickness)
+        for area_np, thickness in highlight_contours:
+            cv2.polylines(canvas, [area_np], isClosed=True, color=ink or highlight_color, thickness=thickness)
+
+        for x1, y1, x2, y2 in occupying_boxes:
+            # Drawn straight into the overlay; the final overlay/frame blend softens it like the spot fills.
+            cv2.rectangle(canvas, (x1, y1), (x2, y2), ink or bbox_color, 2)
+
+        # Pass 3: labels, on top of all spot graphics.
+        for (center_x, center_y), num_text, status_text, is_assigned_to_user in labels:
+            num_w, num_h = _text_size(num_text, num_font_scale, num_font_thickness)
             num_pos = (center_x - num_w // 2, center_y + number_y_offset)
 
             bg_x1_n, bg_y1_n = num_pos[0] - 3, num_pos[1] - num_h - 3
             bg_x2_n, bg_y2_n = num_pos[0] + num_w + 3, num_pos[1] + 3
-            if bg_x1_n >= 0 and bg_y1_n >= 0 and bg_x2_n <= overlay.shape[1] and bg_y2_n <= overlay.shape[0]:
-                sub_img_n = overlay[bg_y1_n:bg_y2_n, bg_x1_n:bg_x2_n]
-                black_rect_n = np.ones(sub_img_n.shape, dtype=np.uint8) * 50
-                res_n = cv2.addWeighted(sub_img_n, 1 - bg_alpha, black_rect_n, bg_alpha, 1.0)
-                overlay[bg_y1_n:bg_y2_n, bg_x1_n:bg_x2_n] = res_n
-            cv2.putText(overlay, num_text, num_pos, cv2.FONT_HERSHEY_SIMPLEX, font_scale * 1.2, font_color,
-                        font_thickness + 1, cv2.LINE_AA)
+            if bg_x1_n >= 0 and bg_y1_n >= 0 and bg_x2_n <= frame_w and bg_y2_n <= frame_h:
+                cv2.rectangle(canvas, (bg_x1_n, bg_y1_n), (bg_x2_n - 1, bg_y2_n - 1), ink or text_bg_color, -1)
+            cv2.putText(canvas, num_text, num_pos, cv2.FONT_HERSHEY_SIMPLEX, num_font_scale, ink or font_color,
+                        num_font_thickness, cv2.LINE_AA)
 
             if show_status_text:
                 current_font_thickness_stat = font_thickness + (1 if is_assigned_to_user else 0)
-                (stat_w, stat_h), _ = cv2.getTextSize(status_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale,
-                                                      current_font_thickness_stat)
+                stat_w, stat_h = status_sizes[status_text]
                 text_pos_stat = (center_x - stat_w // 2, center_y + status_y_offset)
 
                 bg_x1_s, bg_y1_s = text_pos_stat[0] - 3, text_pos_stat[1] - stat_h - 3
                 bg_x2_s, bg_y2_s = text_pos_stat[0] + stat_w + 3, text_pos_stat[1] + 3
-                if bg_x1_s >= 0 and bg_y1_s >= 0 and bg_x2_s <= overlay.shape[1] and bg_y2_s <= overlay.shape[0]:
-                    sub_img_s = overlay[bg_y1_s:bg_y2_s, bg_x1_s:bg_x2_s]
-                    black_rect_s = np.ones(sub_img_s.shape, dtype=np.uint8) * 50
-                    res_s = cv2.addWeighted(sub_img_s, 1 - bg_alpha, black_rect_s, bg_alpha, 1.0)
-                    overlay[bg_y1_s:bg_y2_s, bg_x1_s:bg_x2_s] = res_s
-                cv2.putText(overlay, status_text, text_pos_stat, cv2.FONT_HERSHEY_SIMPLEX, font_scale, font_color,
-                            current_font_thickness_stat, cv2.LINE_AA)
+                if bg_x1_s >= 0 and bg_y1_s >= 0 and bg_x2_s <= frame_w and bg_y2_s <= frame_h:
+                    cv2.rectangle(canvas, (bg_x1_s, bg_y1_s), (bg_x2_s - 1, bg_y2_s - 1), ink or text_bg_color, -1)
+                cv2.putText(canvas, status_text, text_pos_stat, cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                            ink or font_color, current_font_thickness_stat, cv2.LINE_AA)
 
             if is_assigned_to_user:
                 icon_y = center_y - num_h - 15
-                cv2.putText(overlay, "< >", (center_x - 10, icon_y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2,
-                            cv2.LINE_AA)
-        except Exception as e:
-            print(f"Error drawing text/icon for spot index {spot_index}: {e}")
+                cv2.putText(canvas, "< >", (center_x - 10, icon_y), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                            ink or (255, 255, 0), 2, cv2.LINE_AA)
 
-    processed_frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
-    return processed_frame, spot_states, occupied_count, drawn_box_indices_for_spots
\ No newline at end of file
+    overlay_cache.update(spots=spots, key=render_key, buffer=overlay, mask_buffer=mask,
+                         mask=mask[blend_y0:blend_y1, blend_x0:blend_x1])
+    # addWeighted's uint8 path is already vectorized and memory-bound (~2 ms for a full 1080p frame); integer
+    # fixed-point blends in NumPy measure ~5x slower, so it stays the blend, written straight into the frame.
+    cv2.addWeighted(blend_region, alpha, frame_region, 1 - alpha, 0, dst=frame_region)
+    return frame, spot_states, occupied_count, drawn_box_indices_for_spots